@@ -0,0 +1,21 @@
+'''
+Micromouse Maze Solver
+Author: Lei Mao
+Website: https://github.com/leimao/
+Date: 2017/2/15
+Content: Convert text maze files to binary maze files.
+'''
+
+import sys
+import os
+from maze import Maze
+
+if __name__ == '__main__':
+    '''
+    This function converts the text maze files given as arguments when running the script to binary maze files with the same names and the extension '.bin'.
+    '''
+    for filename in sys.argv[1:]:
+        testmaze = Maze(filename)
+        filename_binary = os.path.splitext(filename)[0] + '.bin'
+        testmaze.to_binary(filename_binary)
+        print('Converted %s to %s.' % (filename, filename_binary))
@@ -0,0 +1,118 @@
+'''
+Micromouse Maze Solver
+Author: Lei Mao
+Website: https://github.com/leimao/
+Date: 2017/2/15
+Content: Procedural generation of mazes of any size.
+Notes: All the mazes have a 2 x 2 destination block in the center, which is open inside. The generation is deterministic given the seed.
+'''
+
+import numpy as np
+import sys
+from maze import Maze
+
+def open_walls(walls, xs, ys, directions):
+    '''
+    Open the walls of the cells given in the directions given, and the walls of their neighbors on the other side.
+    walls: numpy array containing the wall information of the maze.
+    xs, ys: numpy arrays of the coordinates of the cells.
+    directions: numpy array of the directions coded as 1 (up), 2 (right), 4 (down) and 8 (left).
+    '''
+    dir_opposite = np.array([0, 4, 8, 0, 1, 0, 0, 0, 2])
+    dir_move_x = np.array([0, 0, 1, 0, 0, 0, 0, 0, -1])
+    dir_move_y = np.array([0, 1, 0, 0, -1, 0, 0, 0, 0])
+    # bitwise_or.at is unbuffered, so that several walls of the same cell could be opened at once
+    np.bitwise_or.at(walls, (xs, ys), directions)
+    np.bitwise_or.at(walls, (xs + dir_move_x[directions], ys + dir_move_y[directions]), dir_opposite[directions])
+
+def sidewinder(dim_x, dim_y, random_state):
+    '''
+    Generate the walls of a perfect maze, where there is exactly one path between any two cells, using the sidewinder algorithm.
+    Each row except the top one is divided into runs of cells connected to the right, and each run is connected upwards from one random cell in the run. The top row is one run.
+    return: numpy array containing the wall information of the maze.
+    '''
+    walls = np.zeros((dim_x, dim_y), dtype = np.int64)
+    # Decide the cells connected to the right. The rows are flattened with x running fastest.
+    right = random_state.rand(dim_y, dim_x) < 0.5
+    right[:, -1] = False
+    right[-1, :-1] = True
+    ys, xs = np.nonzero(right)
+    open_walls(walls, xs, ys, np.full(xs.size, 2, dtype = np.int64))
+    # Runs start at the left border and after the cells not connected to the right
+    starts = np.ones((dim_y, dim_x), dtype = bool)
+    starts[:, 1:] = ~right[:, :-1]
+    starts = np.flatnonzero(starts[:-1, :])
+    lengths = np.diff(np.append(starts, (dim_y - 1) * dim_x))
+    # Connect one random cell of each run upwards
+    chosen = starts + (random_state.rand(starts.size) * lengths).astype(np.int64)
+    ys, xs = np.divmod(chosen, dim_x)
+    open_walls(walls, xs, ys, np.full(xs.size, 1, dtype = np.int64))
+    return walls
+
+def braid(walls, fraction, random_state):
+    '''
+    Remove dead ends by opening one more random wall of the dead-end cells, which adds loops to the maze.
+    fraction: the fraction of the dead ends to remove.
+    '''
+    dim_x = walls.shape[0]
+    dim_y = walls.shape[1]
+    num_openings = (walls & 1 != 0).astype(int) + (walls & 2 != 0) + (walls & 4 != 0) + (walls & 8 != 0)
+    xs, ys = np.nonzero((num_openings == 1) & (random_state.rand(dim_x, dim_y) < fraction))
+    # The walls which could be opened: closed and not on the border of the maze, in the order of up, right, down and left
+    closed = np.stack([(walls[xs, ys] & 1 == 0) & (ys < dim_y - 1), (walls[xs, ys] & 2 == 0) & (xs < dim_x - 1), (walls[xs, ys] & 4 == 0) & (ys > 0), (walls[xs, ys] & 8 == 0) & (xs > 0)], axis = 1)
+    # Choose one of the closed walls randomly
+    choice = np.argmax(random_state.rand(xs.size, 4) * closed, axis = 1)
+    open_walls(walls, xs, ys, np.array([1, 2, 4, 8])[choice])
+
+def open_room(walls, x_min, x_max, y_min, y_max):
+    '''
+    Open all the walls inside the rectangle region from x_min to x_max and from y_min to y_max inclusive.
+    '''
+    walls[x_min:x_max, y_min:y_max + 1] |= 2
+    walls[x_min + 1:x_max + 1, y_min:y_max + 1] |= 8
+    walls[x_min:x_max + 1, y_min:y_max] |= 1
+    walls[x_min:x_max + 1, y_min + 1:y_max + 1] |= 4
+
+def generate_maze(dim_x, dim_y, maze_type = 'perfect', seed = None, braid_fraction = 1.0, num_rooms = None, room_size_max = 4):
+    '''
+    Generate a maze.
+    dim_x, dim_y: the dimensions of the maze, which should be even.
+    maze_type: 'perfect' has exactly one path between any two cells, apart from the destination block. 'braided' removes dead ends from a perfect maze so that it has loops. 'rooms' opens random rectangle rooms in a perfect maze.
+    seed: the seed of the random number generator.
+    braid_fraction: the fraction of the dead ends to remove in braided mazes.
+    num_rooms: the number of rooms in mazes with rooms, one per 64 cells if None.
+    room_size_max: the maximum side length of rooms.
+    return: Maze class.
+    '''
+    if (dim_x % 2) or (dim_y % 2):
+        raise Exception('Maze dimensions must be even in length!')
+    random_state = np.random.RandomState(seed)
+    walls = sidewinder(dim_x = dim_x, dim_y = dim_y, random_state = random_state)
+    if maze_type == 'braided':
+        braid(walls = walls, fraction = braid_fraction, random_state = random_state)
+    elif maze_type == 'rooms':
+        if num_rooms is None:
+            num_rooms = dim_x * dim_y // 64
+        for i in range(num_rooms):
+            size_x, size_y = random_state.randint(2, room_size_max + 1, size = 2)
+            x_min = random_state.randint(0, max(dim_x - size_x, 0) + 1)
+            y_min = random_state.randint(0, max(dim_y - size_y, 0) + 1)
+            open_room(walls = walls, x_min = x_min, x_max = min(x_min + size_x, dim_x) - 1, y_min = y_min, y_max = min(y_min + size_y, dim_y) - 1)
+    elif maze_type != 'perfect':
+        raise Exception('Maze type not defined!')
+    # Destination block in the center of the maze
+    x_center = dim_x // 2 - 1
+    y_center = dim_y // 2 - 1
+    open_room(walls = walls, x_min = x_center, x_max = x_center + 1, y_min = y_center, y_max = y_center + 1)
+    destinations = [[x_center, y_center], [x_center, y_center + 1], [x_center + 1, y_center], [x_center + 1, y_center + 1]]
+
+    return Maze.from_walls(walls = walls, destinations = destinations)
+
+if __name__ == '__main__':
+    '''
+    Generate a maze and write it to a text maze file.
+    To run generator.py, run the following command in the shell:
+    python generator.py dim_x dim_y maze_type seed filename
+    '''
+    testmaze = generate_maze(dim_x = int(sys.argv[1]), dim_y = int(sys.argv[2]), maze_type = str(sys.argv[3]), seed = int(sys.argv[4]))
+    testmaze.to_text(str(sys.argv[5]))
@@ -9,6 +9,220 @@ Notes: This maze class is modified from the maze class in the Udacity Machine Le
 
 
 import numpy as np
+import struct
+
+# Header of binary maze files: magic number, dim_x, dim_y, number of destinations
+binary_header = '<4sIII'
+binary_magic = b'MAZE'
+
+# Directions and their aliases used by the distance tables
+dir_name = {'u': 'up', 'r': 'right', 'd': 'down', 'l': 'left',
+            'up': 'up', 'right': 'right', 'down': 'down', 'left': 'left'}
+
+# Directions and their aliases as the integer codes of the wall information
+dir_int = {'u': 1, 'r': 2, 'd': 4, 'l': 8,
+           'up': 1, 'right': 2, 'down': 4, 'left': 8}
+
+def permissible(walls, cells, codes):
+    '''
+    Check whether each of the cells is passable in the direction given by its integer code.
+    walls: numpy array or Tiled_Array containing the wall information of the maze.
+    cells: array of shape (n, 2) of the coordinates of the cells.
+    codes: integer code 1, 2, 4 or 8 of the direction, or array of n codes.
+    return: boolean numpy array of length n.
+    '''
+    cells = np.asarray(cells, dtype = int).reshape(-1, 2)
+    if isinstance(walls, np.ndarray):
+        values = walls[cells[:,0], cells[:,1]]
+    else:
+        values = np.array([walls[x, y] for x, y in cells.tolist()], dtype = walls.dtype)
+    return (values & codes != 0)
+
+def run_length(opened, axis, reverse):
+    '''
+    Count the number of consecutive True values starting from each element along an axis.
+    opened: boolean numpy array.
+    axis: the axis to scan along.
+    reverse: scan towards the lower indices if False, towards the higher indices if True.
+    return: numpy array of the same shape as opened.
+    '''
+    if reverse:
+        opened = np.flip(opened, axis = axis)
+    count = np.cumsum(opened, axis = axis, dtype = np.int32)
+    # Restart counting after each False value
+    count = count - np.maximum.accumulate(np.where(opened, 0, count), axis = axis)
+    if reverse:
+        count = np.flip(count, axis = axis)
+    return count
+
+def wall_distances(walls):
+    '''
+    Given the wall information of a maze, calculate the number of open cells to the nearest wall in each direction of all cells.
+    walls: numpy array containing the wall information of the maze.
+    return: a dictionary of numpy arrays of the distances to the up, down, left and right walls.
+    '''
+    distances = dict()
+    distances['up'] = run_length(opened = (walls & 1 != 0), axis = 1, reverse = True)
+    distances['right'] = run_length(opened = (walls & 2 != 0), axis = 0, reverse = True)
+    distances['down'] = run_length(opened = (walls & 4 != 0), axis = 1, reverse = False)
+    distances['left'] = run_length(opened = (walls & 8 != 0), axis = 0, reverse = False)
+    return distances
+
+def wall_planes(walls):
+    '''
+    Given the wall information of a maze, split it into four boolean planes of the openings in each direction.
+    walls: numpy array containing the wall information of the maze.
+    return: a dictionary of boolean numpy arrays of the up, right, down and left openings.
+    '''
+    planes = dict()
+    for direction, bit in [('up', 1), ('right', 2), ('down', 4), ('left', 8)]:
+        planes[direction] = (walls & bit != 0)
+    return planes
+
+def expand_planes(planes, cells):
+    '''
+    Calculate the cells reached from the cells given by moving one cell in any direction, using shifts of the whole planes.
+    planes: the wall planes of the maze.
+    cells: boolean numpy array of the cells to expand.
+    return: boolean numpy array of the cells reached.
+    '''
+    reached = np.zeros_like(cells)
+    reached[:,1:] |= cells[:,:-1] & planes['up'][:,:-1]
+    reached[1:,:] |= cells[:-1,:] & planes['right'][:-1,:]
+    reached[:,:-1] |= cells[:,1:] & planes['down'][:,1:]
+    reached[:-1,:] |= cells[1:,:] & planes['left'][1:,:]
+    return reached
+
+def flood_fill(planes, cells):
+    '''
+    Calculate all the cells reachable from the cells given.
+    The cells connected by openings in the same row or column form a run. The reached cells are spread to their whole horizontal runs and then to their whole vertical runs until nothing changes, so that the number of iterations is the number of turns rather than the number of cells on the paths.
+    planes: the wall planes of the maze.
+    cells: boolean numpy array of the cells to start from.
+    return: boolean numpy array of the cells reachable.
+    '''
+    # Label the horizontal runs, numbered with x running fastest
+    starts = np.ones(cells.shape, dtype = bool)
+    starts[1:,:] = ~planes['right'][:-1,:]
+    labels_horizontal = np.cumsum(starts.T.ravel()).reshape(starts.T.shape).T - 1
+    # Label the vertical runs, numbered with y running fastest
+    starts = np.ones(cells.shape, dtype = bool)
+    starts[:,1:] = ~planes['up'][:,:-1]
+    labels_vertical = np.cumsum(starts.ravel()).reshape(starts.shape) - 1
+
+    reached = cells.copy()
+    num_reached = -1
+    while np.count_nonzero(reached) != num_reached:
+        num_reached = np.count_nonzero(reached)
+        for labels in [labels_horizontal, labels_vertical]:
+            runs_reached = np.zeros(labels.size, dtype = bool)
+            runs_reached[labels[reached]] = True
+            reached = runs_reached[labels]
+    return reached
+
+class Tiled_Array(object):
+    def __init__(self, shape, chunk_size = 16, dtype = np.int32):
+        '''
+        Tiled_Array objects are two-dimensional integer arrays stored as square chunks of chunk_size x chunk_size. A chunk is allocated only when a non-zero value is written into it, and all the other elements are zero.
+        They support the indexing used on maze walls: a[x, y], a[x, y_min:y_max], a[x_min:x_max, y] and a[x_min:x_max, y_min:y_max]. Slices return copies as numpy arrays.
+        '''
+        self.shape = tuple(shape)
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+        # Allocated chunks indexed by the chunk coordinates
+        self.chunks = dict()
+
+    def ranges(self, key):
+        '''
+        Convert an index to the ranges of the two axes, and whether each axis was indexed by an integer.
+        '''
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        ranges = list()
+        for index, dim in zip(key, self.shape):
+            if isinstance(index, slice):
+                start, stop, step = index.indices(dim)
+                if step != 1:
+                    raise Exception('Tiled_Array does not support slices with steps!')
+                ranges.append((start, max(start, stop), False))
+            else:
+                index = int(index)
+                if index < 0:
+                    index += dim
+                if (index < 0) or (index >= dim):
+                    raise IndexError('Tiled_Array index out of range!')
+                ranges.append((index, index + 1, True))
+        return ranges
+
+    def chunk_regions(self, ranges, allocated = False):
+        '''
+        Iterate over the chunks overlapping the ranges. Yield the chunk coordinates, the region in the chunk and the region in the ranges.
+        allocated: if True, only the chunks allocated are yielded, so that a long range over mostly unallocated chunks takes no more than the number of chunks allocated.
+        '''
+        (x_start, x_stop, _), (y_start, y_stop, _) = ranges
+        c = self.chunk_size
+        cx_range = range(x_start // c, (x_stop - 1) // c + 1)
+        cy_range = range(y_start // c, (y_stop - 1) // c + 1)
+        if allocated and (len(cx_range) * len(cy_range) > len(self.chunks)):
+            chunk_indices = sorted([(cx, cy) for cx, cy in self.chunks if (cx_range[0] <= cx <= cx_range[-1]) and (cy_range[0] <= cy <= cy_range[-1])])
+        else:
+            chunk_indices = [(cx, cy) for cx in cx_range for cy in cy_range]
+        for cx, cy in chunk_indices:
+            x_lo = max(x_start, cx * c)
+            x_hi = min(x_stop, (cx + 1) * c)
+            y_lo = max(y_start, cy * c)
+            y_hi = min(y_stop, (cy + 1) * c)
+            yield (cx, cy), (slice(x_lo - cx * c, x_hi - cx * c), slice(y_lo - cy * c, y_hi - cy * c)), (slice(x_lo - x_start, x_hi - x_start), slice(y_lo - y_start, y_hi - y_start))
+
+    def __getitem__(self, key):
+        ranges = self.ranges(key)
+        (x_start, x_stop, x_int), (y_start, y_stop, y_int) = ranges
+        if x_int and y_int:
+            chunk = self.chunks.get((x_start // self.chunk_size, y_start // self.chunk_size))
+            if chunk is None:
+                return self.dtype.type(0)
+            return chunk[x_start % self.chunk_size, y_start % self.chunk_size]
+        values = np.zeros((x_stop - x_start, y_stop - y_start), dtype = self.dtype)
+        if values.size > 0:
+            for chunk_index, chunk_region, region in self.chunk_regions(ranges, allocated = True):
+                chunk = self.chunks.get(chunk_index)
+                if chunk is not None:
+                    values[region] = chunk[chunk_region]
+        if x_int:
+            return values[0,:]
+        if y_int:
+            return values[:,0]
+        return values
+
+    def __setitem__(self, key, value):
+        ranges = self.ranges(key)
+        (x_start, x_stop, x_int), (y_start, y_stop, y_int) = ranges
+        values = np.asarray(value, dtype = self.dtype)
+        # Values assigned to a column
+        if y_int and (not x_int) and (values.ndim == 1):
+            values = values[:, np.newaxis]
+        values = np.broadcast_to(values, (x_stop - x_start, y_stop - y_start))
+        if values.size == 0:
+            return
+        # Zeros only need to be written into the chunks allocated
+        for chunk_index, chunk_region, region in self.chunk_regions(ranges, allocated = not values.any()):
+            chunk = self.chunks.get(chunk_index)
+            if chunk is None:
+                # Zeros are not stored
+                if not values[region].any():
+                    continue
+                chunk = np.zeros((self.chunk_size, self.chunk_size), dtype = self.dtype)
+                self.chunks[chunk_index] = chunk
+            chunk[chunk_region] = values[region]
+
+    def copy(self):
+        '''
+        Returns a copy of the array.
+        '''
+        tiled_array = Tiled_Array(shape = self.shape, chunk_size = self.chunk_size, dtype = self.dtype)
+        for chunk_index, chunk in self.chunks.items():
+            tiled_array.chunks[chunk_index] = chunk.copy()
+        return tiled_array
 
 class Maze(object):
     def __init__(self, filename):
@@ -24,71 +238,145 @@ class Maze(object):
         The initialization function also performs some consistency checks for
         wall positioning.
         '''
-        with open(filename, 'rb') as f_in:
+        with open(filename, 'r') as f_in:
+            lines = f_in.read().splitlines()
+
+        # The first line should be integers of the maze dimensions
+        dims = lines[0].split(',')
+        self.dim_x = int(dims[0])
+        self.dim_y = int(dims[1])
+
+        # The second line should be the x coordinates of the maze destinations
+        destinations_x = np.array(lines[1].split(',')).astype(int)
+
+        # The third line should be the y coordinates of the maze destinations
+        destinations_y = np.array(lines[2].split(',')).astype(int)
 
-            # The first line should be integers of the maze dimensions
-            dims = (f_in.next()).split(',')
-            self.dim_x = int(dims[0])
-            self.dim_y = int(dims[1])
-
-            # The second line should be the x coordinates of the maze destinations
-            destinations_x = np.array((f_in.next()).split(',')).astype(int)
-
-            # The third line should be the y coordinates of the maze destinations
-            destinations_y = np.array((f_in.next()).split(',')).astype(int)
-
-            # Examine the destinations of the maze
-            if len(destinations_x) != len(destinations_y):
-                raise Exception('Maze destinations coordinates not paired!')
-            for x in destinations_x:
-                if x > self.dim_x - 1:
-                    raise Exception('Maze destinations x coordinates exception!')
-            for y in destinations_y:
-                if y > self.dim_y - 1:
-                    raise Exception('Maze destinations y coordinates exception!')
-
-            # Save the coordinates of the maze
-            self.destinations = list()
-            for x, y in zip(destinations_x, destinations_y):
-                self.destinations.append([x,y])
-
-            # Subsequent lines describe the permissability of walls
-            walls = []
-            for line in f_in:
-                walls.append(map(int,line.split(',')))
-            self.walls = np.array(walls)
+        # Examine the destinations of the maze
+        if len(destinations_x) != len(destinations_y):
+            raise Exception('Maze destinations coordinates not paired!')
+
+        # Save the coordinates of the maze
+        self.destinations = list()
+        for x, y in zip(destinations_x, destinations_y):
+            self.destinations.append([x,y])
+
+        # Subsequent lines describe the permissability of walls
+        # All the lines are parsed at once
+        rows = [line for line in lines[3:] if line.strip()]
+        walls = np.fromstring(','.join(rows), dtype = np.int64, sep = ',')
 
         # Perform validation on maze
+        # Maze dimensions
+        if (len(rows) != self.dim_x) or (walls.size != self.dim_x * self.dim_y) or any([row.count(',') != self.dim_y - 1 for row in rows]):
+            raise Exception('Maze shape does not match dimension attribute!')
+        self.walls = walls.reshape(self.dim_x, self.dim_y)
+
+        self.initialize()
+
+    def initialize(self, check = True):
+        '''
+        Perform the consistency checks of the destinations and the walls, and calculate the distances to walls.
+        dim_x, dim_y, destinations and walls should have been set.
+        check: if False, the consistency checks are skipped, for the walls which are consistent by construction.
+        '''
+        if check:
+            self.check()
+
+        # Distances to the nearest wall in each direction of all cells
+        self.distances = wall_distances(self.walls)
+        # Openings in each direction of all cells
+        self.planes = wall_planes(self.walls)
+
+    def check(self):
+        '''
+        Perform the consistency checks of the destinations and the walls.
+        '''
+        # Examine the destinations of the maze
+        for x, y in self.destinations:
+            if x > self.dim_x - 1:
+                raise Exception('Maze destinations x coordinates exception!')
+            if y > self.dim_y - 1:
+                raise Exception('Maze destinations y coordinates exception!')
+
         # Maze dimensions
         # That the maze dimensions have to be even in length is simply due to the convenience during maze visualization.
         if (self.dim_x % 2) or (self.dim_y % 2):
             raise Exception('Maze dimensions must be even in length!')
-        if self.walls.shape != (self.dim_x, self.dim_y):
-            raise Exception('Maze shape does not match dimension attribute!')
 
         # Wall permeability
-        wall_errors = []
         # vertical walls
-        for x in range(self.dim_x-1):
-            for y in range(self.dim_y):
-                if (self.walls[x,y] & 2 != 0) != (self.walls[x+1,y] & 8 != 0):
-                    wall_errors.append([(x,y), 'v'])
+        errors_vertical = (self.walls[:-1,:] & 2 != 0) != (self.walls[1:,:] & 8 != 0)
         # horizontal walls
-        for y in range(self.dim_y-1):
-            for x in range(self.dim_x):
-                if (self.walls[x,y] & 1 != 0) != (self.walls[x,y+1] & 4 != 0):
-                    wall_errors.append([(x,y), 'h'])
-
-        if wall_errors:
-            for cell, wall_type in wall_errors:
-                if wall_type == 'v':
-                    cell2 = (cell[0]+1, cell[1])
-                    print 'Inconsistent vertical wall betweeen {} and {}'.format(cell, cell2)
-                else:
-                    cell2 = (cell[0], cell[1]+1)
-                    print 'Inconsistent horizontal wall betweeen {} and {}'.format(cell, cell2)
+        errors_horizontal = (self.walls[:,:-1] & 1 != 0) != (self.walls[:,1:] & 4 != 0)
+
+        if errors_vertical.any() or errors_horizontal.any():
+            for x, y in np.argwhere(errors_vertical).tolist():
+                print('Inconsistent vertical wall betweeen {} and {}'.format((x, y), (x+1, y)))
+            for y, x in np.argwhere(errors_horizontal.T).tolist():
+                print('Inconsistent horizontal wall betweeen {} and {}'.format((x, y), (x, y+1)))
             raise Exception('Consistency errors found in wall specifications!')
 
+    @classmethod
+    def from_walls(cls, walls, destinations, check = True):
+        '''
+        Create a maze from a numpy array of walls and a list of destination coordinates, with the same consistency checks as loading a maze file.
+        check: if False, the consistency checks are skipped, for the walls which are consistent by construction. The dimensions then need not be even.
+        '''
+        maze = cls.__new__(cls)
+        maze.dim_x = walls.shape[0]
+        maze.dim_y = walls.shape[1]
+        maze.destinations = [[int(x), int(y)] for x, y in destinations]
+        maze.walls = walls
+        maze.initialize(check = check)
+        return maze
+
+    @classmethod
+    def from_binary(cls, filename, check = True):
+        '''
+        Load a maze from a binary maze file written by to_binary. The wall payload is memory-mapped and unpacked into the walls in one pass, without reading it into an intermediate buffer. The walls, the distances and the planes are still private arrays calculated for each maze loaded, so loading takes time proportional to the number of cells.
+        check: if False, the consistency checks are skipped, for the trusted files written by to_binary from a maze which has been checked.
+        '''
+        with open(filename, 'rb') as f_in:
+            magic, dim_x, dim_y, num_destinations = struct.unpack(binary_header, f_in.read(struct.calcsize(binary_header)))
+            if magic != binary_magic:
+                raise Exception('Not a binary maze file!')
+            destinations = struct.unpack('<%dI' % (2 * num_destinations), f_in.read(8 * num_destinations))
+        offset = struct.calcsize(binary_header) + 8 * num_destinations
+        # Two cells are packed in each byte, the first cell in the low 4 bits
+        packed = np.memmap(filename, dtype = np.uint8, mode = 'r', offset = offset, shape = ((dim_x * dim_y + 1) // 2,))
+        walls = np.empty(packed.size * 2, dtype = np.uint8)
+        np.bitwise_and(packed, 15, out = walls[0::2])
+        np.right_shift(packed, 4, out = walls[1::2])
+        walls = walls[:dim_x * dim_y].reshape(dim_x, dim_y)
+        return cls.from_walls(walls = walls, destinations = zip(destinations[0::2], destinations[1::2]), check = check)
+
+    def to_text(self, filename):
+        '''
+        Write the maze to a text maze file in the same format as the files loaded by Maze.
+        '''
+        with open(filename, 'w') as f_out:
+            f_out.write('{},{}\n'.format(self.dim_x, self.dim_y))
+            f_out.write(','.join([str(x) for x, y in self.destinations]) + '\n')
+            f_out.write(','.join([str(y) for x, y in self.destinations]) + '\n')
+            for column in self.walls:
+                f_out.write(','.join(column.astype(str).tolist()) + '\n')
+
+    def to_binary(self, filename):
+        '''
+        Write the maze to a binary maze file. The file has a header of a magic number, the dimensions and the number of destinations, then the destination coordinates, and then the walls with two cells packed in each byte.
+        '''
+        walls = (self.walls.ravel() & 15).astype(np.uint8)
+        if walls.size % 2:
+            walls = np.append(walls, np.uint8(0))
+        packed = walls[0::2] | (walls[1::2] << 4)
+        destinations = list()
+        for x, y in self.destinations:
+            destinations += [int(x), int(y)]
+        with open(filename, 'wb') as f_out:
+            f_out.write(struct.pack(binary_header, binary_magic, self.dim_x, self.dim_y, len(self.destinations)))
+            f_out.write(struct.pack('<%dI' % len(destinations), *destinations))
+            f_out.write(packed.tobytes())
 
     def is_permissible(self, cell, direction):
         """
@@ -97,14 +385,27 @@ class Maze(object):
         input as single letter 'u', 'r', 'd', 'l', or complete words 'up', 
         'right', 'down', 'left'.
         """
-        dir_int = {'u': 1, 'r': 2, 'd': 4, 'l': 8,
-                   'up': 1, 'right': 2, 'down': 4, 'left': 8}
-        try:
-            """if permissible: return 1 else return 0"""
-            return (self.walls[tuple(cell)] & dir_int[direction] != 0)
-        except:
-            print 'Invalid direction provided!'
+        if direction not in dir_int:
+            print('Invalid direction provided!')
+            return None
+        return self.is_permissible_code(cell = cell, code = dir_int[direction])
 
+    def is_permissible_code(self, cell, code):
+        """
+        Returns a boolean designating whether or not a cell is passable in the
+        direction given by its integer code 1, 2, 4 or 8 for up, right, down
+        or left.
+        """
+        return (self.walls[cell[0], cell[1]] & code != 0)
+
+    def are_permissible(self, cells, codes):
+        """
+        Returns a boolean array designating whether or not each of the cells
+        is passable in the direction given by its integer code. Cells are
+        input as an array of shape (n, 2). Codes may be a single code or an
+        array of n codes.
+        """
+        return permissible(walls = self.walls, cells = cells, codes = codes)
 
     def dist_to_wall(self, cell, direction):
         """
@@ -113,30 +414,79 @@ class Maze(object):
         may be input as a single letter 'u', 'r', 'd', 'l', or complete words
         'up', 'right', 'down', 'left'.
         """
-        dir_move = {'u': [0, 1], 'r': [1, 0], 'd': [0, -1], 'l': [-1, 0],
-                    'up': [0, 1], 'right': [1, 0], 'down': [0, -1], 'left': [-1, 0]}
-
-        sensing = True
-        distance = 0
-        curr_cell = list(cell) # make copy to preserve original
-        while sensing:
-            if self.is_permissible(curr_cell, direction):
-                distance += 1
-                curr_cell[0] += dir_move[direction][0]
-                curr_cell[1] += dir_move[direction][1]
-            else:
-                sensing = False
-        return distance
+        return int(self.distances[dir_name[direction]][cell[0], cell[1]])
 
 
 
 class Maze_Learned(object):
-    def __init__(self, size_max = 100):
+    def __init__(self, size_max = 100, chunk_size = None):
         '''
         Initialized the Maze_Learned objects to a numpy matrix with a size of size_max x size_max, representing all grid has wall at four directions.
+        If chunk_size is given, the walls and the distances are stored in Tiled_Array, and memory is only allocated for the chunks where walls were learned. size_max could then be much larger than the maze.
+        '''
+        if chunk_size is None:
+            # Put walls everywhere in the maze
+            self.walls = np.zeros((size_max, size_max), dtype=np.int32)
+            # Distances to the nearest wall in each direction of all cells
+            self.distances = wall_distances(self.walls)
+            # Openings in each direction of all cells
+            self.planes = wall_planes(self.walls)
+        else:
+            self.walls = Tiled_Array(shape = (size_max, size_max), chunk_size = chunk_size, dtype = np.int32)
+            # All the distances are zero and there is no opening when there are walls everywhere
+            self.distances = dict()
+            self.planes = dict()
+            for direction in ['up', 'down', 'left', 'right']:
+                self.distances[direction] = Tiled_Array(shape = (size_max, size_max), chunk_size = chunk_size, dtype = np.int32)
+                self.planes[direction] = Tiled_Array(shape = (size_max, size_max), chunk_size = chunk_size, dtype = bool)
+        # Bounding box of the cells learned, [x_min, x_max, y_min, y_max]
+        self.window_bounds = None
+
+    def update_window(self, cells):
+        '''
+        Update the bounding box of the cells learned after the walls of some cells were changed.
+        The cells given are always included in the bounding box, and only the cells given are looked at.
+        cells: list of coordinates of the cells whose walls were changed, which should include all the cells changed.
+        '''
+        if len(cells) == 0:
+            return
+        xs = [cell[0] for cell in cells]
+        ys = [cell[1] for cell in cells]
+        if self.window_bounds is None:
+            self.window_bounds = [min(xs), max(xs), min(ys), max(ys)]
+        else:
+            self.window_bounds = [min([self.window_bounds[0]] + xs), max([self.window_bounds[1]] + xs), min([self.window_bounds[2]] + ys), max([self.window_bounds[3]] + ys)]
+
+    def window(self):
+        '''
+        Returns a Maze_Window of the bounding box of the cells learned.
+        '''
+        if self.window_bounds is None:
+            raise Exception('No cell has been learned!')
+        return Maze_Window(self, *self.window_bounds)
+
+    def update_distances(self, cells):
         '''
-        # Put walls everywhere in the maze
-        self.walls = np.zeros((size_max, size_max), dtype=np.int32)
+        Update the distances to the nearest walls and the wall planes after the walls of some cells were changed.
+        Only the columns and the rows containing the changed cells are scanned again, within the bounding box of the cells learned. The cells outside of the bounding box have no opening, so their distances stay zero. The bounding box should have been updated with update_window.
+        cells: list of coordinates of the cells whose walls were changed. Other cells changed should be in the same rows or columns.
+        '''
+        if self.window_bounds is None:
+            x_min, x_max, y_min, y_max = 0, self.walls.shape[0] - 1, 0, self.walls.shape[1] - 1
+        else:
+            x_min, x_max, y_min, y_max = self.window_bounds
+        for x in set([cell[0] for cell in cells]):
+            column = self.walls[x,y_min:y_max + 1]
+            self.distances['up'][x,y_min:y_max + 1] = run_length(opened = (column & 1 != 0), axis = 0, reverse = True)
+            self.distances['down'][x,y_min:y_max + 1] = run_length(opened = (column & 4 != 0), axis = 0, reverse = False)
+            for direction, plane in wall_planes(column).items():
+                self.planes[direction][x,y_min:y_max + 1] = plane
+        for y in set([cell[1] for cell in cells]):
+            row = self.walls[x_min:x_max + 1,y]
+            self.distances['right'][x_min:x_max + 1,y] = run_length(opened = (row & 2 != 0), axis = 0, reverse = True)
+            self.distances['left'][x_min:x_max + 1,y] = run_length(opened = (row & 8 != 0), axis = 0, reverse = False)
+            for direction, plane in wall_planes(row).items():
+                self.planes[direction][x_min:x_max + 1,y] = plane
 
     def is_permissible(self, cell, direction):
         """
@@ -145,14 +495,27 @@ class Maze_Learned(object):
         input as single letter 'u', 'r', 'd', 'l', or complete words 'up', 
         'right', 'down', 'left'.
         """
-        dir_int = {'u': 1, 'r': 2, 'd': 4, 'l': 8,
-                   'up': 1, 'right': 2, 'down': 4, 'left': 8}
-        try:
-            """if permissible: return 1 else return 0"""
-            return (self.walls[tuple(cell)] & dir_int[direction] != 0)
-        except:
-            print 'Invalid direction provided!'
+        if direction not in dir_int:
+            print('Invalid direction provided!')
+            return None
+        return self.is_permissible_code(cell = cell, code = dir_int[direction])
 
+    def is_permissible_code(self, cell, code):
+        """
+        Returns a boolean designating whether or not a cell is passable in the
+        direction given by its integer code 1, 2, 4 or 8 for up, right, down
+        or left.
+        """
+        return (self.walls[cell[0], cell[1]] & code != 0)
+
+    def are_permissible(self, cells, codes):
+        """
+        Returns a boolean array designating whether or not each of the cells
+        is passable in the direction given by its integer code. Cells are
+        input as an array of shape (n, 2). Codes may be a single code or an
+        array of n codes.
+        """
+        return permissible(walls = self.walls, cells = cells, codes = codes)
 
     def dist_to_wall(self, cell, direction):
         """
@@ -161,17 +524,70 @@ class Maze_Learned(object):
         may be input as a single letter 'u', 'r', 'd', 'l', or complete words
         'up', 'right', 'down', 'left'.
         """
-        dir_move = {'u': [0, 1], 'r': [1, 0], 'd': [0, -1], 'l': [-1, 0],
-                    'up': [0, 1], 'right': [1, 0], 'down': [0, -1], 'left': [-1, 0]}
-
-        sensing = True
-        distance = 0
-        curr_cell = list(cell) # make copy to preserve original
-        while sensing:
-            if self.is_permissible(curr_cell, direction):
-                distance += 1
-                curr_cell[0] += dir_move[direction][0]
-                curr_cell[1] += dir_move[direction][1]
-            else:
-                sensing = False
-        return distance
+        return int(self.distances[dir_name[direction]][cell[0], cell[1]])
+
+
+
+class Maze_Window(object):
+    def __init__(self, maze, x_min, x_max, y_min, y_max):
+        '''
+        Maze_Window objects are views of a rectangle region of a maze, from x_min to x_max and from y_min to y_max inclusive. They have the same walls, distances and planes attributes as the maze in the coordinates of the window, so that the planner could run on the region only. No cell in the window should be open to the cells outside of the window.
+        '''
+        self.offset = [x_min, y_min]
+        self.walls = maze.walls[x_min:x_max + 1, y_min:y_max + 1]
+        self.distances = dict()
+        for direction in maze.distances:
+            self.distances[direction] = maze.distances[direction][x_min:x_max + 1, y_min:y_max + 1]
+        self.planes = dict()
+        for direction in maze.planes:
+            self.planes[direction] = maze.planes[direction][x_min:x_max + 1, y_min:y_max + 1]
+
+    def to_window(self, cell):
+        """
+        Returns the coordinates in the window of a cell in the maze.
+        """
+        return [cell[0] - self.offset[0], cell[1] - self.offset[1]]
+
+    def to_maze(self, cell):
+        """
+        Returns the coordinates in the maze of a cell in the window.
+        """
+        return [cell[0] + self.offset[0], cell[1] + self.offset[1]]
+
+    def is_permissible(self, cell, direction):
+        """
+        Returns a boolean designating whether or not a cell is passable in the
+        given direction. Cell is input as a list. Directions may be
+        input as single letter 'u', 'r', 'd', 'l', or complete words 'up', 
+        'right', 'down', 'left'.
+        """
+        if direction not in dir_int:
+            print('Invalid direction provided!')
+            return None
+        return self.is_permissible_code(cell = cell, code = dir_int[direction])
+
+    def is_permissible_code(self, cell, code):
+        """
+        Returns a boolean designating whether or not a cell is passable in the
+        direction given by its integer code 1, 2, 4 or 8 for up, right, down
+        or left.
+        """
+        return (self.walls[cell[0], cell[1]] & code != 0)
+
+    def are_permissible(self, cells, codes):
+        """
+        Returns a boolean array designating whether or not each of the cells
+        is passable in the direction given by its integer code. Cells are
+        input as an array of shape (n, 2). Codes may be a single code or an
+        array of n codes.
+        """
+        return permissible(walls = self.walls, cells = cells, codes = codes)
+
+    def dist_to_wall(self, cell, direction):
+        """
+        Returns a number designating the number of open cells to the nearest
+        wall in the indicated direction. Cell is input as a list. Directions
+        may be input as a single letter 'u', 'r', 'd', 'l', or complete words
+        'up', 'right', 'down', 'left'.
+        """
+        return int(self.distances[dir_name[direction]][cell[0], cell[1]])
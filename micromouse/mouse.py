@@ -10,24 +10,137 @@ import random
 import sys
 from maze import Maze
 from maze import Maze_Learned
-from planner import best_path
+from maze import Tiled_Array
+from maze import dir_int
 from planner import length_count
+from planner import Search_Tree
+from planner import Incremental_Planner
+from planner import All_Pairs_Table
+from planner import Hierarchical_Planner
+from planner import direction_steps
+from planner import movements_contiguous
+from strategy import Nearest_Unvisited_Strategy
 from observer import orientation_observed
 from observer import coordinate_observed
 from observer import destination_expectation
 
 
+class Frontier(object):
+    def __init__(self, bucket_size = 8):
+        '''
+        The exploration frontier, the grids learned to have at most three walls but not visited yet. It is maintained as the grids are learned and visited, so that the destination candidates are found without scanning the memories.
+        bucket_size: the grids are indexed in square buckets of bucket_size x bucket_size, so that the nearest grids are found by searching the buckets around a location only.
+        '''
+        self.bucket_size = bucket_size
+        self.buckets = dict()
+        self.grids = set()
+
+    def __len__(self):
+
+        return len(self.grids)
+
+    def __contains__(self, cell):
+
+        return tuple(cell) in self.grids
+
+    def bucket(self, cell):
+
+        return (cell[0] // self.bucket_size, cell[1] // self.bucket_size)
+
+    def add(self, cell):
+        '''
+        Add a grid to the frontier.
+        '''
+        cell = tuple(cell)
+        if cell in self.grids:
+            return
+        self.grids.add(cell)
+        self.buckets.setdefault(self.bucket(cell), set()).add(cell)
+
+    def remove(self, cell):
+        '''
+        Remove a grid from the frontier if it is in the frontier.
+        '''
+        cell = tuple(cell)
+        if cell not in self.grids:
+            return
+        self.grids.remove(cell)
+        bucket = self.bucket(cell)
+        self.buckets[bucket].remove(cell)
+        if len(self.buckets[bucket]) == 0:
+            del self.buckets[bucket]
+
+    def cells(self):
+        '''
+        return: all the grids in the frontier, ordered by x and then by y.
+        '''
+        return [list(cell) for cell in sorted(self.grids)]
+
+    def nearest(self, location, k):
+        '''
+        Find the k grids in the frontier nearest to the location regarding the Manhattan Distance. The rings of buckets around the location are searched until no grid in the next ring could be nearer.
+        location: coordinates of the location.
+        k: number of grids to find.
+        return: the grids ordered by the Manhattan Distance, and then by x and y.
+        '''
+        bx, by = self.bucket(location)
+        found = list()
+        num_searched = 0
+        r = 0
+        while num_searched < len(self.grids):
+            # The buckets at Chebyshev distance r from the bucket of the location
+            if r == 0:
+                ring = [(bx, by)]
+            else:
+                ring = [(bx + dx, by + dy) for dx in xrange(-r, r + 1) for dy in [-r, r]]
+                ring += [(bx + dx, by + dy) for dx in [-r, r] for dy in xrange(-r + 1, r)]
+            for bucket in ring:
+                for cell in self.buckets.get(bucket, ()):
+                    found.append((abs(cell[0] - location[0]) + abs(cell[1] - location[1]), cell[0], cell[1]))
+                    num_searched += 1
+            # The grids in the buckets beyond ring r are at least r * bucket_size + 1 away
+            if len(found) >= k and sorted(found)[k - 1][0] <= r * self.bucket_size:
+                break
+            r += 1
+
+        return [[x, y] for distance, x, y in sorted(found)[:k]]
+
+    def adjacent(self, maze, location):
+        '''
+        Find the grids in the frontier which are the neighbors of the location and are not separated from the location by a wall.
+        maze: the maze learned.
+        location: coordinates of the location.
+        return: the grids ordered by x and then by y.
+        '''
+        neighbors = list()
+        for direction in ['up', 'right', 'down', 'left']:
+            cell = (location[0] + direction_steps[direction][0], location[1] + direction_steps[direction][1])
+            if cell in self.grids and maze.is_permissible_code(cell = location, code = dir_int[direction]):
+                neighbors.append(list(cell))
+
+        return sorted(neighbors)
+
+
 class Mouse(object):
-    def __init__(self, memory_size = 100, movements = [0,1,2,3], heuristic = True, intuition = True):
+    def __init__(self, memory_size = 100, movements = [0,1,2,3], heuristic = True, intuition = True, chunk_size = None, all_pairs = False, cluster_size = None, strategy = None):
         # Initialize Mouse object
-        self.maze_learned = Maze_Learned(size_max = memory_size)
-        self.maze_visited = np.zeros((memory_size, memory_size), dtype = np.int32)
+        # The table of all pairs and the hierarchical planner, which is built on such tables, split the straight lines into the longest movement and one shorter movement
+        if (all_pairs or (cluster_size is not None)) and not movements_contiguous(movements):
+            raise Exception('all_pairs and cluster_size require all the movements from 1 to the longest one!')
+        # If chunk_size is given, the memories are allocated in chunks on demand as the maze is learned
+        self.maze_learned = Maze_Learned(size_max = memory_size, chunk_size = chunk_size)
+        if chunk_size is None:
+            self.maze_visited = np.zeros((memory_size, memory_size), dtype = np.int32)
+        else:
+            self.maze_visited = Tiled_Array(shape = (memory_size, memory_size), chunk_size = chunk_size, dtype = np.int32)
         # Dimension of the memories
         self.dim_x = memory_size
         self.dim_y = memory_size
         # The location of mouse in mouse's memory
         self.location_defined = [memory_size/2, memory_size/2]
         self.maze_visited[tuple(self.location_defined)] = 1
+        # Whether the walls of the current location have been sensed. The walls of all the other visited grids have been sensed.
+        self.location_sensed = False
         # The orientation of mouse in mouse's memory
         self.orientation = 'up'
         # Set the orientation of mouse when it was put into the maze as 'up' in mouse's memory
@@ -45,8 +158,32 @@ class Mouse(object):
         self.heuristic = heuristic
         # Percentage of visited maze
         self.percentage_visited = 0
+        # Running counts of the grids learned to have at most three walls and of the grids visited
+        self.num_learned = 0
+        self.num_visited_grids = 1
         # Use intuition
         self.intuition = intuition
+        # The unvisited grids learned to have at most three walls, maintained as the maze is learned
+        self.frontier = Frontier()
+        # Planners to the starting point, to the final destination and to the unvisited grids, updated as the maze is learned
+        self.planner_origin = Incremental_Planner(maze = self.maze_learned, destinations = [self.starting], movements = self.movements)
+        self.planner_destinations = Incremental_Planner(maze = self.maze_learned, destinations = self.destinations, movements = self.movements)
+        self.planner_frontier = Incremental_Planner(maze = self.maze_learned, destinations = [], movements = self.movements)
+        # If all_pairs is True, the table of all pairs of the learned region scores the destination candidates. It is built after the first cells are learned.
+        self.all_pairs = all_pairs
+        self.all_pairs_table = None
+        # If cluster_size is given, the paths to the starting point and to the final destination are planned by the hierarchical planner, whose clusters are built again only when their walls change
+        if cluster_size is None:
+            self.planner_hierarchical = None
+        else:
+            self.planner_hierarchical = Hierarchical_Planner(maze = self.maze_learned, movements = self.movements, cluster_size = cluster_size)
+        # The gaps between the least number of actions to the final destination through the openings learned and its lower bound, one for each step checked
+        self.optimality_gaps = list()
+        # The exploration strategy choosing the next destination, by default the unvisited grid that takes the least number of actions
+        if strategy is None:
+            self.strategy = Nearest_Unvisited_Strategy()
+        else:
+            self.strategy = strategy
 
     def obstacle_sensor(self, maze, location_real, orientation_real):
         '''
@@ -84,29 +221,72 @@ class Mouse(object):
         distances_defined: a list of distance to the mouse_defined up, down, left, right obstacles.
         location_defined: coordinates of current location that the micromouse defined.
         maze_learned: the wall information of maze that the mouse has learned. For this maze, there is something special here. The maze_learned for the micromouse was initialized with a maze of certain size large enough where there is four walls in each grid. The micromouse would erase the wall with the information from the sensor. Passages are coded as a 4-bit number, with a bit value taking 0 if there is a wall and 1 if there is no wall. The 1s register corresponds with a square's top edge, 2s register the right edge, 4s register the bottom edge, and 8s register the left edge (The same to maze.walls).
-        return: an updated maze_learned.
+        return: list of coordinates of the grids whose walls were changed.
         '''
+        x, y = self.location_defined
+        # The grids learned are the column from the down obstacle to the up obstacle and the row from the left obstacle to the right obstacle, which are both passages through the current location
+        # Every grid in the column opens up except the top one and opens down except the bottom one, and every grid in the row opens right except the rightmost one and opens left except the leftmost one
+        column = np.zeros(distances_defined[1] + distances_defined[0] + 1, dtype = np.int32)
+        column[:-1] |= 1
+        column[1:] |= 4
+        row = np.zeros(distances_defined[2] + distances_defined[3] + 1, dtype = np.int32)
+        row[:-1] |= 2
+        row[1:] |= 8
+        y_min = y - distances_defined[1]
+        x_min = x - distances_defined[2]
+
         # Learn the maze
-        # orientation_defined: up
-        for y in xrange(self.location_defined[1], self.location_defined[1] + distances_defined[0]):
-            self.maze_learned.walls[self.location_defined[0]][y] = (self.maze_learned.walls[self.location_defined[0]][y]|1)
-        for y in xrange(self.location_defined[1] + 1, self.location_defined[1] + distances_defined[0] + 1):
-            self.maze_learned.walls[self.location_defined[0]][y] = (self.maze_learned.walls[self.location_defined[0]][y]|4)
-        # orientation_defined: down
-        for y in xrange(self.location_defined[1] - distances_defined[1] + 1, self.location_defined[1] + 1):
-            self.maze_learned.walls[self.location_defined[0]][y] = (self.maze_learned.walls[self.location_defined[0]][y]|4)
-        for y in xrange(self.location_defined[1] - distances_defined[1], self.location_defined[1]):
-            self.maze_learned.walls[self.location_defined[0]][y] = (self.maze_learned.walls[self.location_defined[0]][y]|1)
-        # orientation_defined: left
-        for x in xrange(self.location_defined[0] - distances_defined[2] + 1, self.location_defined[0] + 1):
-            self.maze_learned.walls[x][self.location_defined[1]] = (self.maze_learned.walls[x][self.location_defined[1]]|8)
-        for x in xrange(self.location_defined[0] - distances_defined[2], self.location_defined[0]):
-            self.maze_learned.walls[x][self.location_defined[1]] = (self.maze_learned.walls[x][self.location_defined[1]]|2)
-        # orientation_defined: right
-        for x in xrange(self.location_defined[0], self.location_defined[0] + distances_defined[3]):
-            self.maze_learned.walls[x][self.location_defined[1]] = (self.maze_learned.walls[x][self.location_defined[1]]|2)
-        for x in xrange(self.location_defined[0] + 1, self.location_defined[0] + distances_defined[3] + 1):
-            self.maze_learned.walls[x][self.location_defined[1]] = (self.maze_learned.walls[x][self.location_defined[1]]|8)
+        changed = set()
+        walls = np.asarray(self.maze_learned.walls[x, y_min:y_min + column.shape[0]])
+        walls_learned = walls | column
+        for i in np.flatnonzero(walls_learned != walls).tolist():
+            changed.add((x, y_min + i))
+        self.num_learned += np.count_nonzero((walls == 0) & (walls_learned != 0))
+        self.maze_learned.walls[x, y_min:y_min + column.shape[0]] = walls_learned
+        walls = np.asarray(self.maze_learned.walls[x_min:x_min + row.shape[0], y])
+        walls_learned = walls | row
+        for i in np.flatnonzero(walls_learned != walls).tolist():
+            changed.add((x_min + i, y))
+        self.num_learned += np.count_nonzero((walls == 0) & (walls_learned != 0))
+        self.maze_learned.walls[x_min:x_min + row.shape[0], y] = walls_learned
+        changed = [list(cell) for cell in sorted(changed)]
+
+        # The grids changed which have not been visited are in the frontier
+        for cell in changed:
+            if self.maze_visited[tuple(cell)] == 0:
+                self.frontier.add(cell)
+        self.location_sensed = True
+        # Update the bounding box of the grids learned, which always includes the current location
+        self.maze_learned.update_window(cells = changed + [self.location_defined])
+        # The distances and the planners change only if some walls were removed
+        if len(changed) > 0:
+            # Update the distances to walls. All the grids changed are in the same row or column of the current location.
+            self.maze_learned.update_distances(cells = [self.location_defined])
+            # Update the planners
+            for planner in [self.planner_origin, self.planner_destinations, self.planner_frontier]:
+                planner.update(cells = [self.location_defined])
+            if self.planner_hierarchical is not None:
+                self.planner_hierarchical.update(cells = [self.location_defined])
+            if self.all_pairs_table is not None:
+                self.all_pairs_table.update(cells = [self.location_defined])
+        if self.all_pairs and self.all_pairs_table is None:
+            self.all_pairs_table = All_Pairs_Table(maze = self.maze_learned, movements = self.movements)
+
+        return changed
+
+    @property
+    def num_reachable(self):
+        '''
+        Number of the grids known to be reachable, the grids learned to have at most three walls and the starting point.
+        '''
+        return self.num_learned + int(self.maze_learned.walls[tuple(self.starting)] == 0)
+
+    @property
+    def num_visited(self):
+        '''
+        Number of the grids visited.
+        '''
+        return self.num_visited_grids
 
     def destination_next(self):
         '''
@@ -115,99 +295,106 @@ class Mouse(object):
         Calculate the number of actions, length of movement for the mouse moving to each of the destination candidates.
         Choose the destination that takes the least number of actions. If the number of actions are the same, choose the destination that takes the smallest length of movement. If the length of movement is the same, just randomly pick one.
         '''
-        # Find out destination candidates
-        destination_candidates = list()
-        for x in xrange(self.dim_x):
-            for y in xrange(self.dim_y):
-                # Check whether the grid does not have four walls
-                if self.maze_learned.walls[x][y] != 0:
-                    # Check whether the grid has been visited
-                    if self.maze_visited[x][y] == 0:
-                        destination_candidates.append([x,y])
+        # Only the grids in the bounding box of the grids learned are examined
+        window = self.maze_learned.window()
+
+        # The destination candidates are the grids in the frontier, the grids which do not have four walls and have not been visited
+        destination_candidates = None
+
+        # Whether the destination candidates are all the unvisited grids
+        frontier_full = True
 
         # If the mouse has been any corner of the maze and there is no destination candidate left, the mouse choose its current location as its next destination.
-        if len(destination_candidates) == 0:
-            destination_candidates.append(self.location_defined)
+        if len(self.frontier) == 0:
+            destination_candidates = [self.location_defined]
+            frontier_full = False
 
         # If among the destination candidates, there is any destination candidates that are the neighbors of the micromouse's current location, randomly pick one of such destination candidates and remove other destination candidates.
-        if self.intuition == True:
-            destination_candidates_intuition = list()
-            for destination_candidate in destination_candidates:
-                manhattan_distance = np.sum(np.absolute(np.array(destination_candidate) - np.array(self.location_defined)))
-                if manhattan_distance == 1:
-                    # up
-                    if ((destination_candidate[1] - self.location_defined[1]) == 1) and (self.maze_learned.is_permissible(cell = self.location_defined, direction = 'up')):
-                        destination_candidates_intuition.append(destination_candidate)
-                    # down
-                    elif ((destination_candidate[1] - self.location_defined[1]) == -1) and (self.maze_learned.is_permissible(cell = self.location_defined, direction = 'down')):
-                        destination_candidates_intuition.append(destination_candidate)
-                    # left
-                    elif ((destination_candidate[0] - self.location_defined[0]) == -1) and (self.maze_learned.is_permissible(cell = self.location_defined, direction = 'left')):
-                        destination_candidates_intuition.append(destination_candidate)
-                    # right
-                    elif ((destination_candidate[0] - self.location_defined[0]) == 1) and (self.maze_learned.is_permissible(cell = self.location_defined, direction = 'right')):
-                        destination_candidates_intuition.append(destination_candidate)
+        if self.intuition == True and destination_candidates is None:
+            destination_candidates_intuition = self.frontier.adjacent(maze = self.maze_learned, location = self.location_defined)
 
             if len(destination_candidates_intuition) > 0:
                 destination_candidates = random.sample(destination_candidates_intuition,1)
+                frontier_full = False
             #print(destination_candidates)
 
         '''
         Heuristic destnation selection
         Because the number of destination candidates might be large, it would be slow to calculate the best path to all destination candidates. We could select the destination candidates heuristically by only selecting the destination candidates that are very close to the current location of mouse regarding the Manhattan Distance.
         '''
-        # Calculate the Manhattan Distance of each destination candidate to the current location of mouse
-        
-        if self.heuristic == True:
-            manhattan_distances = list()
-            for destination_candidate in destination_candidates:
-                manhattan_distances.append(np.sum(np.absolute(np.array(destination_candidate) - np.array(self.location_defined))))
-            manhattan_distances_sorted_index = np.argsort(manhattan_distances)
+        # The spatial index of the frontier finds the destination candidates nearest to the current location of mouse regarding the Manhattan Distance
+        # The grids at the same distance are ordered by x and then by y
+        if self.heuristic == True and destination_candidates is None and len(self.frontier) > 4:
+            destination_candidates = self.frontier.nearest(location = self.location_defined, k = 4)
+            frontier_full = False
+
+        if destination_candidates is None:
+            destination_candidates = self.frontier.cells()
 
-            
-            if len(destination_candidates) > 4:
-                destination_candidates_heuristic = list()
-                for i in xrange(4):
-                    destination_candidates_heuristic.append(destination_candidates[manhattan_distances_sorted_index[i]])
-            else:
-                destination_candidates_heuristic = destination_candidates[:]
-                          
-            destination_candidates = destination_candidates_heuristic[:]
-        
-  
         #print('destination_candidates')
         #print(destination_candidates)
 
-        # Calculate the number of actions and the length of movements it will take to the destination
-        num_actions_candidates = list()
-        length_candidates = list()
-
-        for destination in destination_candidates:
-            direction_list, movement_list, path_list = best_path(maze = self.maze_learned, starting = self.location_defined, destinations = [destination], movements = self.movements)
-            num_actions = len(path_list) - 1
-            num_actions_candidates.append(num_actions)
-            length = length_count(path_list = path_list)
-            length_candidates.append(length)
-
-        num_actions_candidates = np.array(num_actions_candidates)
-        length_candidates = np.array(length_candidates)
-        
-        # The index of destinations which takes the least number of actions
-        candidates_1_index = np.argwhere(num_actions_candidates == np.amin(num_actions_candidates)).astype(int).flatten().tolist()
+        # If the destination candidates are all the unvisited grids, the planner to the unvisited grids finds the destination candidates that take the least number of actions and then the smallest length of movement
+        if frontier_full:
+            self.planner_frontier.set_destinations(destination_candidates)
+            paths = self.planner_frontier.paths_best(starting = self.location_defined)
+            if len(paths) == 0:
+                direction_list, movement_list, path_list = self.planner_frontier.path(starting = self.location_defined)
+                destination_best = path_list[-1]
+            else:
+                # If the length of movement is the same, just randomly pick one
+                destinations_best = sorted(paths.keys())
+                if len(destinations_best) > 1:
+                    destination_best = random.sample(destinations_best,1)[0]
+                else:
+                    destination_best = destinations_best[0]
+                direction_list, movement_list, path_list = paths[destination_best]
+                destination_best = list(destination_best)
+        else:
+            # Calculate the number of actions and the length of movements it will take to the destination
+            # The destination candidates which could not be reached take more actions than any other
+            unreachable = self.dim_x * self.dim_y
+            num_actions_candidates = list()
+            length_candidates = list()
+            if self.all_pairs_table is not None:
+                # Look up the destination candidates in the table of all pairs
+                for destination in destination_candidates:
+                    count = self.all_pairs_table.count(starting = self.location_defined, destination = destination)
+                    if count is None:
+                        count = (unreachable, 0)
+                    num_actions_candidates.append(count[0])
+                    length_candidates.append(count[1])
+            else:
+                # One search from the current location evaluates all the destination candidates
+                search_tree = Search_Tree(maze = window, starting = window.to_window(self.location_defined), movements = self.movements)
+                for destination in destination_candidates:
+                    num_actions = search_tree.action_count[tuple(window.to_window(destination))]
+                    num_actions_candidates.append(num_actions if num_actions >= 0 else unreachable)
+                    length_candidates.append(search_tree.length[tuple(window.to_window(destination))])
+
+            num_actions_candidates = np.array(num_actions_candidates)
+            length_candidates = np.array(length_candidates)
+            
+            # The index of destinations which takes the least number of actions
+            candidates_1_index = np.argwhere(num_actions_candidates == np.amin(num_actions_candidates)).astype(int).flatten().tolist()
 
-        # The index of destinations which takes the shortest length of movements
-        candidates_2_index = np.argwhere(length_candidates == np.amin(length_candidates[candidates_1_index])).astype(int).flatten().tolist()
+            # The index of destinations which takes the shortest length of movements
+            candidates_2_index = np.argwhere(length_candidates == np.amin(length_candidates[candidates_1_index])).astype(int).flatten().tolist()
 
-        if len(candidates_1_index) > 1:
-            if len(candidates_2_index) > 1:
-                destination_index = random.sample(candidates_2_index,1)[0]
+            if len(candidates_1_index) > 1:
+                if len(candidates_2_index) > 1:
+                    destination_index = random.sample(candidates_2_index,1)[0]
+                else:
+                    destination_index = candidates_2_index[0]
             else:
-                destination_index = candidates_2_index[0]
-        else:
-            destination_index = candidates_1_index[0]
+                destination_index = candidates_1_index[0]
 
-        destination_best = destination_candidates[destination_index]
-        direction_list, movement_list, path_list = best_path(maze = self.maze_learned, starting = self.location_defined, destinations = [destination_best], movements = self.movements)
+            destination_best = destination_candidates[destination_index]
+            if self.all_pairs_table is not None:
+                direction_list, movement_list, path_list = self.all_pairs_table.path(starting = self.location_defined, destination = destination_best)
+            else:
+                direction_list, movement_list, path_list = search_tree.path(destination = window.to_window(destination_best))
+                path_list = [window.to_maze(cell) for cell in path_list]
 
         return destination_best, direction_list, movement_list, path_list
 
@@ -221,40 +408,88 @@ class Mouse(object):
         # Update maze_learned in mouse's memory
         self.learn_maze(distance_defined)
 
-        # Calculate the percentage of visited maze
-        num_reachable = 0
-        num_visited = 0
-        for x in xrange(self.dim_x):
-            for y in xrange(self.dim_y):
-                if self.maze_visited[x][y] != 0:
-                    num_visited += 1
-                if (self.maze_learned.walls[x][y] != 0) or ([x,y] == self.starting):
-                    num_reachable += 1
-        self.percentage_visited = float(num_visited)/num_reachable
+        # Calculate the percentage of visited maze from the running counts
+        self.percentage_visited = float(self.num_visited)/self.num_reachable
 
-        # Choose the destination candidate and take actions
-        destination_best, direction_list, movement_list, path_list = self.destination_next()
+        # Choose the destination candidate with the exploration strategy and take actions
+        destination_best, direction_list, movement_list, path_list = self.strategy.step(mouse = self)
 
         # Update the mouse's location
         self.location_defined = destination_best
+        self.location_sensed = False
 
         # Update the mouse's orientation
         self.orientation = direction_list[-1]
 
         # Update maze_visted
+        if self.maze_visited[tuple(self.location_defined)] == 0:
+            self.num_visited_grids += 1
         self.maze_visited[tuple(self.location_defined)] = 1
+        self.frontier.remove(self.location_defined)
 
         return destination_best, direction_list, movement_list, path_list
 
+    def maze_optimistic(self):
+        '''
+        Build the maze in which the walls that have not been observed are assumed to be open. The walls of the visited grids have all been observed by the sensors, except the current location if it has not been sensed yet, so only the walls between two grids not sensed are assumed to be open.
+        The maze covers the grids learned and a ring of unknown grids around them, within mouse's memory. Any path through the unknown grids outside could be replaced by a path along the ring without more actions, so the least number of actions in this maze is a lower bound of that in the real maze.
+        return: the optimistic maze, and the offset of its coordinates in mouse's memory.
+        '''
+        x_min, x_max, y_min, y_max = self.maze_learned.window_bounds
+        x_min = max(x_min - 1, 0)
+        y_min = max(y_min - 1, 0)
+        x_max = min(x_max + 1, self.dim_x - 1)
+        y_max = min(y_max + 1, self.dim_y - 1)
+        walls = np.array(self.maze_learned.walls[x_min:x_max + 1, y_min:y_max + 1])
+        unsensed = np.asarray(self.maze_visited[x_min:x_max + 1, y_min:y_max + 1]) == 0
+        if not self.location_sensed:
+            unsensed[self.location_defined[0] - x_min, self.location_defined[1] - y_min] = True
+
+        unobserved = unsensed[:,:-1] & unsensed[:,1:]
+        walls[:,:-1] |= np.where(unobserved, 1, 0).astype(walls.dtype)
+        walls[:,1:] |= np.where(unobserved, 4, 0).astype(walls.dtype)
+        unobserved = unsensed[:-1,:] & unsensed[1:,:]
+        walls[:-1,:] |= np.where(unobserved, 2, 0).astype(walls.dtype)
+        walls[1:,:] |= np.where(unobserved, 8, 0).astype(walls.dtype)
+
+        # The walls are consistent by construction, and the dimensions of the window could be odd
+        return Maze.from_walls(walls = walls, destinations = [], check = False), [x_min, y_min]
+
+    def optimality_gap(self):
+        '''
+        Compare the least number of actions from the starting point to the final destination through the openings learned with the least number of actions in the optimistic maze, and record the gap in optimality_gaps.
+        When the gap is zero, the path planned to the final destination is optimal in the real maze and further exploration could not improve it.
+        return: the gap in number of actions, None if the final destination has not been found.
+        '''
+        if len(self.destinations) == 0:
+            self.optimality_gaps.append(None)
+            return None
+
+        self.planner_destinations.set_destinations(self.destinations)
+        num_actions_learned = self.planner_destinations.cost(self.starting)[0]
+
+        maze, offset = self.maze_optimistic()
+        search_tree = Search_Tree(maze = maze, starting = [self.starting[0] - offset[0], self.starting[1] - offset[1]], movements = self.movements)
+        num_actions_optimistic = min([search_tree.action_count[destination[0] - offset[0], destination[1] - offset[1]] for destination in self.destinations])
+
+        gap = int(num_actions_learned - num_actions_optimistic)
+        self.optimality_gaps.append(gap)
+
+        return gap
+
     def return_origin(self):
         '''
         Return to the starting point memorized from the current location based on the knowledge of maze_learned.
         '''
         # Find the best path using least number actions
-        direction_list, movement_list, path_list = best_path(maze = self.maze_learned, starting = self.location_defined, destinations = [self.starting], movements = self.movements)
+        if self.planner_hierarchical is not None:
+            direction_list, movement_list, path_list = self.planner_hierarchical.path(starting = self.location_defined, destinations = [self.starting])
+        else:
+            direction_list, movement_list, path_list = self.planner_origin.path(starting = self.location_defined)
 
         # Update the mouse's location
         self.location_defined = path_list[-1]
+        self.location_sensed = False
 
         # Update the mouse's orientation
         self.orientation = direction_list[-1]
@@ -266,10 +501,15 @@ class Mouse(object):
         Go to the destination point memorized from the current location based on the knowledge of maze_learned.
         '''
         # Find the best path using least number actions
-        direction_list, movement_list, path_list = best_path(maze = self.maze_learned, starting = self.location_defined, destinations = self.destinations, movements = self.movements)
+        if self.planner_hierarchical is not None:
+            direction_list, movement_list, path_list = self.planner_hierarchical.path(starting = self.location_defined, destinations = self.destinations)
+        else:
+            self.planner_destinations.set_destinations(self.destinations)
+            direction_list, movement_list, path_list = self.planner_destinations.path(starting = self.location_defined)
 
         # Update the mouse's location
         self.location_defined = path_list[-1]
+        self.location_sensed = False
 
         # Update the mouse's orientation
         self.orientation = direction_list[-1]
@@ -295,7 +535,8 @@ if __name__ == '__main__':
     num_actions = 0
     length_movement = 0
     maze_visited_observed = np.zeros((testmaze.dim_x, testmaze.dim_y), dtype = np.int32)
-    percentage_maze_visited_observed = float(np.sum(maze_visited_observed))/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
+    num_visited_observed = 0
+    percentage_maze_visited_observed = float(num_visited_observed)/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
 
     # Explore the maze
     while (testmouse.percentage_visited < 1.0): # Return when mouse visited all the grids reachable
@@ -326,8 +567,10 @@ if __name__ == '__main__':
             print('Warning: location_expected did not match location_real.')
 
         # Update observed maze_visited
+        if maze_visited_observed[tuple(location_real)] == 0:
+            num_visited_observed += 1
         maze_visited_observed[tuple(location_real)] = 1
-        percentage_maze_visited_observed = float(np.sum(maze_visited_observed))/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
+        percentage_maze_visited_observed = float(num_visited_observed)/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
 
         # Check if the mouse reached final destination
         if location_real in destination_final:
@@ -43,40 +43,20 @@ def coordinate_observed(reference_mouse, reference_observed, coordinate_mouse):
 def destination_expectation(maze, starting, direction_list, movement_list):
     if len(direction_list) != len(movement_list):
         raise Exception('Lengths of direction_list and movement_list were not equal.')
+    # Step of each direction and its integer code
+    steps = {'up': (0, 1, 1), 'down': (0, -1, 4), 'left': (-1, 0, 8), 'right': (1, 0, 2)}
     location = starting[:]
     crash = False
-    for i in xrange(len(direction_list)):
-        if direction_list[i] == 'up':
-            # Examine crash
-            for j in xrange(movement_list[i]):
-                if maze.walls[location[0]][location[1]+j] & 1 == 0:
-                    crash = True
-            # Update location
-            location = [location[0],location[1]+movement_list[i]]
-
-        elif direction_list[i] == 'down':
-            # Examine crash
-            for j in xrange(movement_list[i]):
-                if maze.walls[location[0]][location[1]-j] & 4 == 0:
-                    crash = True
-            # Update location
-            location = [location[0],location[1]-movement_list[i]]
-
-        elif direction_list[i] == 'left':
-            # Examine crash
-            for j in xrange(movement_list[i]):
-                if maze.walls[location[0]-j][location[1]] & 8 == 0:
-                    crash = True
-            # Update location
-            location = [location[0]-movement_list[i],location[1]]
-
-        elif direction_list[i] == 'right':
-            # Examine crash
-            for j in xrange(movement_list[i]):
-                if maze.walls[location[0]+j][location[1]] & 2 == 0:
-                    crash = True
-            # Update location
-            location = [location[0]+movement_list[i],location[1]]
+    for direction, movement in zip(direction_list, movement_list):
+        dx, dy, code = steps[direction]
+        # Examine crash on all the cells left during the movement at once
+        if movement > 0:
+            j = np.arange(movement)
+            cells = np.stack([location[0] + dx * j, location[1] + dy * j], axis = 1)
+            if not maze.are_permissible(cells = cells, codes = code).all():
+                crash = True
+        # Update location
+        location = [location[0] + dx * movement, location[1] + dy * movement]
 
     if crash == True:
         print('Warning: mouse crashed into wall.')
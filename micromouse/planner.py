@@ -7,8 +7,20 @@ Content: Optimal path determination using Bellman Equation
 '''
 
 import numpy as np
+import collections
+import hashlib
+import heapq
 import sys
+import time
 from maze import Maze
+from maze import flood_fill
+from maze import Maze_Window
+from maze import dir_int
+from generator import generate_maze
+
+# Unit step and opposite of each direction
+direction_steps = {'up': (0, 1), 'down': (0, -1), 'left': (-1, 0), 'right': (1, 0)}
+direction_opposite = {'up': 'down', 'down': 'up', 'left': 'right', 'right': 'left'}
 
 def best_action(maze, utility, state, destinations, movements):
     '''
@@ -23,13 +35,7 @@ def best_action(maze, utility, state, destinations, movements):
     if (state in destinations) or (maze.walls[tuple(state)] == 0):
         # Micromouse stays still
         return ('up', 0, state, 0)
-    # The distances to all four directions
-    distance_dict = dict()
-    directions = ['up', 'down', 'left', 'right']
-    for direction in directions:
-        distance_dict[direction] = maze.dist_to_wall(cell = tuple(state), direction = direction)
     # Maximize the future reward
-    # Calculate the next state after certain action
     # Initialize maximum future reward using the reward after taking action 'up-0'
     state_next = state
     reward_max = utility[tuple(state_next)]
@@ -37,18 +43,15 @@ def best_action(maze, utility, state, destinations, movements):
     movement_best = 0
     state_next_best = state_next[:]
     # Find maximum future reward and its corresponding action
-    for direction in directions:
+    for direction, code, dx, dy in [('up', 1, 0, 1), ('down', 4, 0, -1), ('left', 8, -1, 0), ('right', 2, 1, 0)]:
+        # Blocked directions only lead to the state itself, which never beats the initial reward
+        if not maze.is_permissible_code(cell = state, code = code):
+            continue
+        distance = maze.dist_to_wall(cell = state, direction = direction)
         for movement in movements:
             # Determine next state after action
-            if direction == 'up':
-                state_next = [state[0], state[1] + min(distance_dict['up'], movement)]
-            elif direction == 'down':
-                state_next = [state[0], state[1] - min(distance_dict['down'], movement)]
-            elif direction == 'left':
-                state_next = [state[0] - min(distance_dict['left'], movement), state[1]]
-            elif direction == 'right':
-                state_next = [state[0] + min(distance_dict['right'], movement), state[1]]
-            #print (state, direction, movement, state_next)
+            step = min(distance, movement)
+            state_next = [state[0] + dx * step, state[1] + dy * step]
             # Compare to maximum future reward
             if utility[tuple(state_next)] > reward_max:
                 reward_max = utility[tuple(state_next)]
@@ -58,60 +61,1471 @@ def best_action(maze, utility, state, destinations, movements):
 
     return (direction_best, movement_best, state_next_best, reward_max)
 
-def utility_calculation(maze, destinations, movements):
+def next_state_indices(maze, movements):
+    '''
+    Given a rectangle maze, precompute the state reached from every state after taking each action.
+    maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+    movements: a list of movement length allowed.
+    return: a list of (direction, movement, next_x, next_y). next_x and next_y are numpy arrays of the same shape as maze.walls containing the coordinates of the next states. The actions are in the same order as they are examined in best_action.
+    '''
+    # Measure the dimensions of the maze
+    dim_x = maze.walls.shape[0]
+    dim_y = maze.walls.shape[1]
+    # The distances to all four directions of all states
+    directions = ['up', 'down', 'left', 'right']
+    distance_dict = dict()
+    for direction in directions:
+        distance_dict[direction] = maze.distances[direction]
+    # Coordinates of all states
+    state_x, state_y = np.indices((dim_x, dim_y))
+    # Next state after each action
+    next_states = list()
+    for direction in directions:
+        for movement in movements:
+            if direction == 'up':
+                next_x = state_x
+                next_y = state_y + np.minimum(distance_dict['up'], movement)
+            elif direction == 'down':
+                next_x = state_x
+                next_y = state_y - np.minimum(distance_dict['down'], movement)
+            elif direction == 'left':
+                next_x = state_x - np.minimum(distance_dict['left'], movement)
+                next_y = state_y
+            elif direction == 'right':
+                next_x = state_x + np.minimum(distance_dict['right'], movement)
+                next_y = state_y
+            next_states.append((direction, movement, next_x, next_y))
+
+    return next_states
+
+def greedy_policy(utility, next_states, terminal):
+    '''
+    Given the utility values of all states, calculate the greedy action of every state in the same way as best_action.
+    utility: a numpy array containing the utility values of all the states possible in the maze.
+    next_states: the next state index arrays of all actions from next_state_indices.
+    terminal: a boolean numpy array of the states where micromouse stays still.
+    return: a numpy array of the index of the best action of every state. 0 is the action 'up-0', and i is the action next_states[i - 1].
+    '''
+    reward = [utility]
+    for direction, movement, next_x, next_y in next_states:
+        reward.append(utility[next_x, next_y])
+    # argmax returns the first action with the maximum future reward
+    policy = np.argmax(np.array(reward), axis = 0)
+    policy[terminal] = 0
+    return policy
+
+def live_cells(maze, starting, destinations, movements = None, return_statistics = False):
+    '''
+    Given a rectangle maze, find the cells which could be on a best path from the starting point to the destinations. The cells which could not be reached from the starting point are removed, and then the dead-end cells without destination are filled repeatedly, because a path never has to enter a dead-end branch.
+    A path never has to enter a dead-end branch only if the micromouse could stop in every cell. If the movements do not contain all the lengths from 1 to the longest one, the micromouse might have to enter a dead-end branch to turn around or to line up a longer movement, so only the unreachable cells are removed.
+    maze: Maze, Maze_Learned or Maze_Window class. The wall planes of the maze are used.
+    starting: the coordinates of starting point.
+    destination: the coordinates of destination points. There can be multiple destination points.
+    movements: a list of movement length allowed. All the lengths from 1 to the longest one are assumed if None.
+    return_statistics: also return a dictionary of the number of cells, the number of unreachable cells removed, the number of dead-end cells removed, the number of live cells, the number of filling iterations and the time spent in seconds.
+    return: boolean numpy array of the live cells.
+    '''
+    time_start = time.time()
+    planes = dict()
+    for direction in ['up', 'down', 'left', 'right']:
+        planes[direction] = np.asarray(maze.planes[direction][:,:])
+    # The starting point and the destinations are never filled
+    kept = np.zeros(maze.walls.shape, dtype = bool)
+    kept[tuple(starting)] = True
+    for destination in destinations:
+        kept[tuple(destination)] = True
+    # Cells reachable from the starting point
+    starting_cells = np.zeros(maze.walls.shape, dtype = bool)
+    starting_cells[tuple(starting)] = True
+    reachable = flood_fill(planes = planes, cells = starting_cells)
+    live = reachable.copy()
+    # Fill the dead-end cells until there is none left
+    num_iterations = 0
+    while (movements is None) or movements_contiguous(movements):
+        # Number of live neighbors of each cell
+        neighbors = np.zeros(live.shape, dtype = np.int8)
+        neighbors[:,:-1] += planes['up'][:,:-1] & live[:,1:]
+        neighbors[:-1,:] += planes['right'][:-1,:] & live[1:,:]
+        neighbors[:,1:] += planes['down'][:,1:] & live[:,:-1]
+        neighbors[1:,:] += planes['left'][1:,:] & live[:-1,:]
+        dead_ends = live & (neighbors <= 1) & (~kept)
+        if not dead_ends.any():
+            break
+        live &= ~dead_ends
+        num_iterations += 1
+
+    if return_statistics:
+        num_live = int(np.count_nonzero(live))
+        num_reachable = int(np.count_nonzero(reachable))
+        statistics = {'num_cells': int(live.size), 'num_unreachable': int(live.size) - num_reachable, 'num_dead_ends': num_reachable - num_live, 'num_live': num_live, 'num_iterations': num_iterations, 'time': time.time() - time_start}
+        return live, statistics
+    return live
+
+def utility_calculation(maze, destinations, movements, utility_initial = None, update = 'jacobi', stop = 'residual', live = None, return_statistics = False):
     '''
     Given a rectangle maze, starting point and destination point, calculate the utility value of each state.
     maze: Maze class. maze.walls is a numpy array containing the wall information of the maze. The wall property can only be 'wall' or 'no wall'. maze numpy array format: maze[0] - the first vertical cells in maze, maze[1] - the second vertical cells in maze, etc.
     destination: the coordinates of destination points. There can be multiple destination points.
+    utility_initial: utility values to start the value iteration from, for example the utility values calculated for the maze before it changed. Zeros if None.
+    update: 'jacobi' updates all states in one batched step per sweep. 'gauss_seidel' updates the states in place column by column, the columns closest to the destinations first, so that each column uses the utility values already updated in the same sweep.
+    stop: 'residual' stops when the sum of squared utility differences of one sweep falls below the threshold. 'policy' stops as soon as the greedy policy does not change in one sweep. The unchanged policy is only a safe stop from zeros: from utility_initial, the policy could stay the same for a sweep before the change of the maze has reached those states, so 'policy' then also waits for the residual to fall below the threshold.
+    live: boolean numpy array of the cells which could be on a best path, for example from live_cells. The other cells are treated as the grids which have four walls. None if all the cells are live.
+    return_statistics: also return the number of sweeps and the list of residuals of all sweeps.
     return: equilibrated utility value of each state in maze.
+    The Bellman update is equivalent to calling best_action on every state.
     '''
+    if update not in ['jacobi', 'gauss_seidel']:
+        raise Exception('Value iteration update not defined!')
+    if stop not in ['residual', 'policy']:
+        raise Exception('Value iteration stop criterion not defined!')
     # Measure the dimensions of the maze
     dim_x = maze.walls.shape[0]
     dim_y = maze.walls.shape[1]
     # Initialize utility for all states
-    utility = np.zeros((dim_x, dim_y), dtype = np.float)
+    if utility_initial is None:
+        utility = np.zeros((dim_x, dim_y), dtype = np.float)
+    else:
+        if utility_initial.shape != (dim_x, dim_y):
+            raise Exception('Initial utility shape does not match the maze!')
+        utility = np.array(utility_initial, dtype = np.float)
     # Set reward for all states
     # As long as reward(not_destination) < (1 - gamma) x reward(destination), the algorithm is going to converge.
     gamma = 0.95
     # Set reward for ordinary grids
     reward = np.full((dim_x, dim_y), fill_value = -1, dtype = np.int32)
-    # Set reward for all grids which have four walls
-    for x in xrange(dim_x):
-        for y in xrange(dim_y):
-            if maze.walls[x][y] == 0:
-                reward[x][y] = (-5 * (dim_x * dim_y))
+    # Set reward for all grids which have four walls, and for the cells removed by pruning
+    reward[maze.walls == 0] = (-5 * (dim_x * dim_y))
+    if live is not None:
+        reward[~live] = (-5 * (dim_x * dim_y))
     # Set reward for the destination grids
     for destination in destinations:
         reward[tuple(destination)] = (5 * (dim_x * dim_y))
+    # Micromouse stays still in destinations and in the grids which have four walls
+    terminal = (maze.walls == 0)
+    if live is not None:
+        terminal |= ~live
+    for destination in destinations:
+        terminal[tuple(destination)] = True
+    # Next state index arrays of all actions
+    next_states = next_state_indices(maze = maze, movements = movements)
+    # Only the states which are not terminal are updated in the sweeps. The utility of a terminal state is its reward.
+    active = np.flatnonzero(~terminal)
+    next_active = [np.ravel_multi_index((next_x.ravel()[active], next_y.ravel()[active]), (dim_x, dim_y)) for direction, movement, next_x, next_y in next_states]
+    rows_active = [np.flatnonzero(~terminal[x]) for x in xrange(dim_x)]
+    # Order of the columns for Gauss-Seidel update
+    if len(destinations) > 0:
+        columns = sorted(xrange(dim_x), key = lambda x: min([abs(x - destination[0]) for destination in destinations]))
+    else:
+        columns = range(dim_x)
     # Markov Decision Process
     # Bellman Equation value iteration until convergence
-    utility_updated = utility.copy()
     convergence_threhold = 0.00001 * (dim_x * dim_y)
-    utility_difference = 0.1
+    num_sweeps = 0
+    residuals = list()
+    policy = None
+
+    while True:
+        if update == 'jacobi':
+            # Maximum future reward, initialized using the reward after taking action 'up-0'
+            utility_flat = utility.ravel()
+            reward_max = utility_flat[active]
+            for next_active_states in next_active:
+                np.maximum(reward_max, utility_flat[next_active_states], out = reward_max)
+            utility_updated = reward.astype(np.float)
+            utility_updated.flat[active] = reward.flat[active] + gamma * reward_max
+            utility_difference = np.sum(np.square(utility_updated - utility))
+            utility = utility_updated
+        elif update == 'gauss_seidel':
+            utility_difference = 0
+            for x in columns:
+                rows = rows_active[x]
+                reward_max = utility[x, rows]
+                for direction, movement, next_x, next_y in next_states:
+                    np.maximum(reward_max, utility[next_x[x, rows], next_y[x, rows]], out = reward_max)
+                utility_updated = reward[x].astype(np.float)
+                utility_updated[rows] = reward[x, rows] + gamma * reward_max
+                utility_difference += np.sum(np.square(utility_updated - utility[x]))
+                utility[x] = utility_updated
+        num_sweeps += 1
+        residuals.append(utility_difference)
 
-    while utility_difference > convergence_threhold:
-        for x in xrange(dim_x):
-            for y in xrange(dim_y):
-                utility_updated[x][y] = reward[x][y] + gamma * best_action(maze = maze, state = [x,y], utility = utility, destinations = destinations, movements = movements)[3]
-        utility_difference = np.sum(np.square(utility_updated - utility))
-        utility = utility_updated.copy()
+        if stop == 'residual':
+            if utility_difference <= convergence_threhold:
+                break
+        elif stop == 'policy':
+            policy_updated = greedy_policy(utility = utility, next_states = next_states, terminal = terminal)
+            # Starting from utility_initial, the policy is only trusted once the utility values converged as well
+            if (policy is not None) and np.array_equal(policy_updated, policy) and ((utility_initial is None) or (utility_difference <= convergence_threhold)):
+                break
+            policy = policy_updated
 
     # print(utility_difference)
     # np.savetxt("utility.csv", utility, delimiter = ",")
 
+    if return_statistics:
+        return utility, num_sweeps, residuals
     return utility
 
-def best_path(maze, starting, destinations, movements):
+def action_edges(maze, movements, live = None):
+    '''
+    Given a rectangle maze, list all the actions which move the micromouse as edges between flattened states.
+    maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+    movements: a list of movement length allowed.
+    live: boolean numpy array of the cells which could be on a best path. Only the actions between live cells are edges. None if all the cells are live.
+    return: numpy arrays of the states before the actions, the states after the actions, the length of movements and the indices of the actions in actions, and the list of actions as (direction, movement). The edges are ordered by the actions in the same order as best_action.
+    '''
+    # Measure the dimensions of the maze
+    dim_x = maze.walls.shape[0]
+    dim_y = maze.walls.shape[1]
+    state_x, state_y = np.indices((dim_x, dim_y))
+    state = np.arange(dim_x * dim_y)
+    source_list = list()
+    target_list = list()
+    length_list = list()
+    action_list = list()
+    actions = list()
+    for direction, movement, next_x, next_y in next_state_indices(maze = maze, movements = movements):
+        target = np.ravel_multi_index((next_x.ravel(), next_y.ravel()), (dim_x, dim_y))
+        # Actions which keep the micromouse still are not edges
+        moved = (target != state)
+        if live is not None:
+            moved &= live.ravel() & live.ravel()[target]
+        source_list.append(state[moved])
+        target_list.append(target[moved])
+        length_list.append((np.absolute(next_x - state_x) + np.absolute(next_y - state_y)).ravel()[moved])
+        action_list.append(np.full(np.sum(moved), fill_value = len(actions), dtype = np.int32))
+        actions.append((direction, movement))
+
+    return np.concatenate(source_list), np.concatenate(target_list), np.concatenate(length_list), np.concatenate(action_list), actions
+
+def action_graph(maze, movements, live = None):
+    '''
+    Given a rectangle maze, build the graph of all actions which move the micromouse, with the edges grouped by the state after taking the action.
+    maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+    movements: a list of movement length allowed.
+    live: boolean numpy array of the cells which could be on a best path. None if all the cells are live.
+    return: indptr and sources in compressed sparse row format. The states which reach the flattened state i after one action are sources[indptr[i]:indptr[i+1]].
+    '''
+    num_states = maze.walls.shape[0] * maze.walls.shape[1]
+    sources, targets, lengths, action_indices, actions = action_edges(maze = maze, movements = movements, live = live)
+    # Group the edges by the state after taking the action
+    order = np.argsort(targets, kind = 'mergesort')
+    indptr = np.zeros(num_states + 1, dtype = np.int64)
+    np.cumsum(np.bincount(targets, minlength = num_states), out = indptr[1:])
+
+    return indptr, sources[order]
+
+def action_count_calculation(maze, destinations, movements, live = None):
+    '''
+    Given a rectangle maze and destination points, calculate the least number of actions from each state to the destinations using breadth-first search backwards from the destinations.
+    maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+    destination: the coordinates of destination points. There can be multiple destination points.
+    movements: a list of movement length allowed.
+    live: boolean numpy array of the cells which could be on a best path, for example from live_cells. The search does not enter the other cells. None if all the cells are live.
+    return: numpy array of the least number of actions of each state. The states which could not reach the destinations have -1.
+    '''
+    # Measure the dimensions of the maze
+    dim_x = maze.walls.shape[0]
+    dim_y = maze.walls.shape[1]
+    indptr, sources = action_graph(maze = maze, movements = movements, live = live)
+    action_count = np.full(dim_x * dim_y, fill_value = -1, dtype = np.int32)
+    # Breadth-first search level by level, starting from all the destinations
+    frontier = np.unique(np.ravel_multi_index(np.array(destinations, dtype = np.int64).reshape(-1, 2).T, (dim_x, dim_y)))
+    action_count[frontier] = 0
+    level = 0
+    while frontier.size > 0:
+        level += 1
+        # Gather the states which reach the frontier after one action
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        edges = np.repeat(starts - offsets, lengths) + np.arange(np.sum(lengths))
+        candidates = sources[edges]
+        frontier = np.unique(candidates[action_count[candidates] < 0])
+        action_count[frontier] = level
+
+    return action_count.reshape(dim_x, dim_y)
+
+def best_action_count(maze, action_count, state, destinations, movements):
+    '''
+    Given a rectangle maze and the least number of actions of all states, calculate the best option to take at the state given to reach the destinations in least number of actions.
+    maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+    action_count: a numpy array containing the least number of actions of all the states possible in the maze.
+    state: the coordinates of grid which you want to find the best action on.
+    movements: a list of movement length allowed.
+    return: the best direction to take, the best movement to take, the state after taking the action, the least number of actions of the state after taking the action.
+    '''
+    # Check whether the state is already in destinations or could not reach the destinations
+    if (state in destinations) or (action_count[tuple(state)] < 0):
+        # Micromouse stays still
+        return ('up', 0, state, action_count[tuple(state)])
+    # Initialize the least number of actions using the action 'up-0'
+    count_min = action_count[tuple(state)]
+    direction_best = 'up'
+    movement_best = 0
+    state_next_best = state[:]
+    # Actions are examined in the same order as best_action
+    for direction in ['up', 'down', 'left', 'right']:
+        distance = maze.dist_to_wall(cell = state, direction = direction)
+        for movement in movements:
+            if direction == 'up':
+                state_next = [state[0], state[1] + min(distance, movement)]
+            elif direction == 'down':
+                state_next = [state[0], state[1] - min(distance, movement)]
+            elif direction == 'left':
+                state_next = [state[0] - min(distance, movement), state[1]]
+            elif direction == 'right':
+                state_next = [state[0] + min(distance, movement), state[1]]
+            count_next = action_count[tuple(state_next)]
+            if (count_next >= 0) and (count_next < count_min):
+                count_min = count_next
+                direction_best = direction
+                movement_best = movement
+                state_next_best = state_next[:]
+
+    return (direction_best, movement_best, state_next_best, count_min)
+
+class Search_Tree(object):
+    def __init__(self, maze, starting, movements):
+        '''
+        Search the least number of actions from the starting point to all the states in one breadth-first search. Among the series of actions that take the least number of actions, the one with the smallest length of movement is kept.
+        maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+        starting: the coordinates of starting point.
+        movements: a list of movement length allowed.
+        Search_Tree objects have the following attributes:
+        - action_count: the least number of actions to each state, -1 if the state could not be reached. (numpy array)
+        - length: the length of movement to each state along the series of actions kept. (numpy array)
+        - parent: the flattened state before the last action to each state, -1 for the starting point. (numpy array)
+        - parent_action: the index in actions of the last action to each state. (numpy array)
+        '''
+        self.dim_x = maze.walls.shape[0]
+        self.dim_y = maze.walls.shape[1]
+        self.starting = list(starting)
+        num_states = self.dim_x * self.dim_y
+        sources, targets, lengths, action_indices, self.actions = action_edges(maze = maze, movements = movements)
+        # Group the edges by the state before taking the action. The stable sort keeps the order of actions.
+        order = np.argsort(sources, kind = 'mergesort')
+        sources = sources[order]
+        targets = targets[order]
+        lengths = lengths[order]
+        action_indices = action_indices[order]
+        indptr = np.zeros(num_states + 1, dtype = np.int64)
+        np.cumsum(np.bincount(sources, minlength = num_states), out = indptr[1:])
+
+        action_count = np.full(num_states, fill_value = -1, dtype = np.int32)
+        length = np.zeros(num_states, dtype = np.int32)
+        parent = np.full(num_states, fill_value = -1, dtype = np.int64)
+        parent_action = np.full(num_states, fill_value = -1, dtype = np.int32)
+        # Breadth-first search level by level
+        frontier = np.array([np.ravel_multi_index(tuple(starting), (self.dim_x, self.dim_y))])
+        action_count[frontier] = 0
+        level = 0
+        while frontier.size > 0:
+            level += 1
+            # Gather the edges leaving the frontier
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            offsets = np.cumsum(counts) - counts
+            edges = np.repeat(starts - offsets, counts) + np.arange(np.sum(counts))
+            edges = edges[action_count[targets[edges]] < 0]
+            # For each new state, keep the edge with the smallest length of movement, then the first edge
+            length_candidates = length[sources[edges]] + lengths[edges]
+            order = np.lexsort((np.arange(edges.size), length_candidates, targets[edges]))
+            frontier, first = np.unique(targets[edges[order]], return_index = True)
+            edges = edges[order[first]]
+            action_count[frontier] = level
+            length[frontier] = length_candidates[order[first]]
+            parent[frontier] = sources[edges]
+            parent_action[frontier] = action_indices[edges]
+
+        self.action_count = action_count.reshape(self.dim_x, self.dim_y)
+        self.length = length.reshape(self.dim_x, self.dim_y)
+        self.parent = parent.reshape(self.dim_x, self.dim_y)
+        self.parent_action = parent_action.reshape(self.dim_x, self.dim_y)
+
+    def path(self, destination):
+        '''
+        Reconstruct the series of actions from the starting point to the destination.
+        destination: the coordinates of destination point.
+        return: list of direction, list of movement, list of path
+        '''
+        # Micromouse stays still if it is already at the destination or the destination could not be reached
+        if (list(destination) == self.starting) or (self.action_count[tuple(destination)] < 0):
+            if list(destination) != self.starting:
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [self.starting[:], self.starting[:]]
+
+        path_list = list()
+        direction_list = list()
+        movement_list = list()
+        state = [int(destination[0]), int(destination[1])]
+        while self.parent[tuple(state)] >= 0:
+            direction, movement = self.actions[self.parent_action[tuple(state)]]
+            path_list.append(state)
+            direction_list.append(direction)
+            movement_list.append(movement)
+            state = [int(i) for i in np.unravel_index(self.parent[tuple(state)], (self.dim_x, self.dim_y))]
+        path_list.append(state)
+        path_list.reverse()
+        direction_list.reverse()
+        movement_list.reverse()
+
+        return direction_list, movement_list, path_list
+
+class Reverse_Search_Tree(object):
+    def __init__(self, maze, destinations, movements):
+        '''
+        Search the least number of actions from all the states to the destinations in one breadth-first search backwards from the destinations. Among the series of actions that take the least number of actions, the one with the smallest length of movement is kept, so every state could be a starting point.
+        maze: Maze class. maze.walls is a numpy array containing the wall information of the maze.
+        destination: the coordinates of destination points. There can be multiple destination points.
+        movements: a list of movement length allowed.
+        Reverse_Search_Tree objects have the following attributes:
+        - action_count: the least number of actions from each state to the destinations, -1 if the state could not reach the destinations. (numpy array)
+        - length: the length of movement from each state to the destinations along the series of actions kept. (numpy array)
+        - policy: the index in actions of the first action to take at each state, -1 for the destinations and the states which could not reach the destinations. (numpy array)
+        - next_state: the flattened state after the first action of each state, -1 if there is no action. (numpy array)
+        - actions: the list of actions as (direction, movement).
+        '''
+        self.dim_x = maze.walls.shape[0]
+        self.dim_y = maze.walls.shape[1]
+        self.destinations = [list(destination) for destination in destinations]
+        num_states = self.dim_x * self.dim_y
+        sources, targets, lengths, action_indices, self.actions = action_edges(maze = maze, movements = movements)
+        # Group the edges by the state after taking the action. The stable sort keeps the order of actions.
+        order = np.argsort(targets, kind = 'mergesort')
+        sources = sources[order]
+        targets = targets[order]
+        lengths = lengths[order]
+        action_indices = action_indices[order]
+        indptr = np.zeros(num_states + 1, dtype = np.int64)
+        np.cumsum(np.bincount(targets, minlength = num_states), out = indptr[1:])
+
+        action_count = np.full(num_states, fill_value = -1, dtype = np.int32)
+        length = np.zeros(num_states, dtype = np.int32)
+        policy = np.full(num_states, fill_value = -1, dtype = np.int32)
+        next_state = np.full(num_states, fill_value = -1, dtype = np.int64)
+        # Breadth-first search level by level, starting from all the destinations
+        frontier = np.unique(np.ravel_multi_index(np.array(destinations, dtype = np.int64).reshape(-1, 2).T, (self.dim_x, self.dim_y)))
+        action_count[frontier] = 0
+        level = 0
+        while frontier.size > 0:
+            level += 1
+            # Gather the edges entering the frontier
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            offsets = np.cumsum(counts) - counts
+            edges = np.repeat(starts - offsets, counts) + np.arange(np.sum(counts))
+            edges = edges[action_count[sources[edges]] < 0]
+            # For each new state, keep the edge with the smallest length of movement, then the first action
+            length_candidates = length[targets[edges]] + lengths[edges]
+            order = np.lexsort((action_indices[edges], length_candidates, sources[edges]))
+            frontier, first = np.unique(sources[edges[order]], return_index = True)
+            edges = edges[order[first]]
+            action_count[frontier] = level
+            length[frontier] = length_candidates[order[first]]
+            policy[frontier] = action_indices[edges]
+            next_state[frontier] = targets[edges]
+
+        self.action_count = action_count.reshape(self.dim_x, self.dim_y)
+        self.length = length.reshape(self.dim_x, self.dim_y)
+        self.policy = policy.reshape(self.dim_x, self.dim_y)
+        self.next_state = next_state.reshape(self.dim_x, self.dim_y)
+
+    def path(self, starting):
+        '''
+        Follow the policy from the starting point to the destinations.
+        starting: the coordinates of starting point.
+        return: list of direction, list of movement, list of path
+        '''
+        # Micromouse stays still if it is already at the destinations or the destinations could not be reached
+        if self.policy[tuple(starting)] < 0:
+            if list(starting) not in self.destinations:
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [list(starting), list(starting)]
+
+        path_list = [list(starting)]
+        direction_list = list()
+        movement_list = list()
+        state = list(starting)
+        while self.policy[tuple(state)] >= 0:
+            direction, movement = self.actions[self.policy[tuple(state)]]
+            state = [int(i) for i in np.unravel_index(self.next_state[tuple(state)], (self.dim_x, self.dim_y))]
+            direction_list.append(direction)
+            movement_list.append(movement)
+            path_list.append(state)
+
+        return direction_list, movement_list, path_list
+
+    def ranking(self):
+        '''
+        Returns the list of coordinates of the states which could reach the destinations, from the hardest starting point to the easiest, ranked by the number of actions and then the length of movement.
+        '''
+        xs, ys = np.nonzero(self.action_count >= 0)
+        order = np.lexsort((-self.length[xs, ys], -self.action_count[xs, ys]))
+        return [[int(xs[i]), int(ys[i])] for i in order]
+
+    def statistics(self):
+        '''
+        Returns a dictionary of statistics of the maze over all the starting points which could reach the destinations: the number of such starting points, and the mean and the maximum of the number of actions and of the length of movement.
+        '''
+        reachable = (self.action_count >= 0)
+        return {'num_starting': int(np.count_nonzero(reachable)), 'action_count_mean': float(np.mean(self.action_count[reachable])), 'action_count_max': int(np.amax(self.action_count[reachable])), 'length_mean': float(np.mean(self.length[reachable])), 'length_max': int(np.amax(self.length[reachable]))}
+
+class Incremental_Planner(object):
+    def __init__(self, maze, destinations, movements):
+        '''
+        Maintain the least number of actions, and then the smallest length of movement, from all the states to the destinations while the maze is changing. This is Lifelong Planning A* without heuristic, searching backwards from the destinations.
+        maze: Maze or Maze_Learned class. The planner keeps a reference to the maze and is told which cells changed.
+        destination: the coordinates of destination points. There can be multiple destination points.
+        movements: a list of movement length allowed.
+        The cost of a state is a tuple of (number of actions, length of movement). States which could not reach the destinations have infinite cost.
+        '''
+        self.maze = maze
+        self.movements = movements
+        self.destinations = set()
+        self.dim_x = maze.walls.shape[0]
+        self.dim_y = maze.walls.shape[1]
+        self.infinity = (float('inf'), float('inf'))
+        # Cost estimates, and one-step lookahead costs
+        self.g = dict()
+        self.rhs = dict()
+        # Priority queue of inconsistent states
+        self.queue = list()
+        # The distances to walls last seen by the planner
+        self.distances = dict()
+        for direction in ['up', 'down', 'left', 'right']:
+            self.distances[direction] = maze.distances[direction].copy()
+        self.set_destinations(destinations)
+
+    def successors(self, state):
+        '''
+        Return the states after taking each action which moves the micromouse, and the length of movement of each action, in the same order as best_action.
+        '''
+        dir_move = {'up': (0, 1), 'down': (0, -1), 'left': (-1, 0), 'right': (1, 0)}
+        successors = list()
+        for direction in ['up', 'down', 'left', 'right']:
+            distance = int(self.maze.distances[direction][state])
+            for movement in self.movements:
+                length = min(distance, movement)
+                if length > 0:
+                    successors.append((direction, movement, (state[0] + dir_move[direction][0] * length, state[1] + dir_move[direction][1] * length), length))
+        return successors
+
+    def predecessors(self, state):
+        '''
+        Return the states which could reach the state given after one action. A few extra states might be returned, which is harmless.
+        '''
+        dir_move = {'up': (0, 1), 'down': (0, -1), 'left': (-1, 0), 'right': (1, 0)}
+        predecessors = list()
+        for direction in ['up', 'down', 'left', 'right']:
+            for length in xrange(1, max(self.movements) + 1):
+                x = state[0] - dir_move[direction][0] * length
+                y = state[1] - dir_move[direction][1] * length
+                if (x < 0) or (x >= self.dim_x) or (y < 0) or (y >= self.dim_y) or (self.maze.distances[direction][x, y] < length):
+                    break
+                predecessors.append((x, y))
+        return predecessors
+
+    def update_vertex(self, state):
+        '''
+        Recalculate the one-step lookahead cost of the state and queue the state if it is inconsistent.
+        '''
+        if state in self.destinations:
+            self.rhs[state] = (0, 0)
+        else:
+            rhs = self.infinity
+            for direction, movement, state_next, length in self.successors(state):
+                g = self.g.get(state_next, self.infinity)
+                if (g[0] + 1, g[1] + length) < rhs:
+                    rhs = (g[0] + 1, g[1] + length)
+            if rhs == self.infinity:
+                self.rhs.pop(state, None)
+            else:
+                self.rhs[state] = rhs
+        g = self.g.get(state, self.infinity)
+        rhs = self.rhs.get(state, self.infinity)
+        if g != rhs:
+            heapq.heappush(self.queue, (min(g, rhs), state))
+
+    def compute(self):
+        '''
+        Process the inconsistent states until the costs of all the states are consistent.
+        '''
+        while self.queue:
+            key, state = heapq.heappop(self.queue)
+            g = self.g.get(state, self.infinity)
+            rhs = self.rhs.get(state, self.infinity)
+            # Skip the states which became consistent or were queued again with another key
+            if (g == rhs) or (key != min(g, rhs)):
+                continue
+            if g > rhs:
+                self.g[state] = rhs
+            else:
+                self.g.pop(state, None)
+                self.update_vertex(state)
+            for state_last in self.predecessors(state):
+                self.update_vertex(state_last)
+
+    def set_destinations(self, destinations):
+        '''
+        Change the destinations. Only the destinations added or removed are updated.
+        '''
+        destinations = set([(int(destination[0]), int(destination[1])) for destination in destinations])
+        changed = destinations.symmetric_difference(self.destinations)
+        self.destinations = destinations
+        for state in changed:
+            self.update_vertex(state)
+
+    def update(self, cells):
+        '''
+        Update the planner after the walls of some cells were changed.
+        cells: list of coordinates of the cells whose walls were changed.
+        '''
+        # The actions change only in the columns and the rows containing the changed cells, within the bounding box of the cells learned if the maze has one
+        window_bounds = getattr(self.maze, 'window_bounds', None)
+        if window_bounds is None:
+            x_min, x_max, y_min, y_max = 0, self.dim_x - 1, 0, self.dim_y - 1
+        else:
+            x_min, x_max, y_min, y_max = window_bounds
+        changed = set()
+        for x in set([cell[0] for cell in cells]):
+            for direction in ['up', 'down']:
+                distances = self.maze.distances[direction][x,y_min:y_max + 1]
+                for y in np.flatnonzero(self.distances[direction][x,y_min:y_max + 1] != distances):
+                    changed.add((int(x), int(y_min + y)))
+                self.distances[direction][x,y_min:y_max + 1] = distances
+        for y in set([cell[1] for cell in cells]):
+            for direction in ['left', 'right']:
+                distances = self.maze.distances[direction][x_min:x_max + 1,y]
+                for x in np.flatnonzero(self.distances[direction][x_min:x_max + 1,y] != distances):
+                    changed.add((int(x_min + x), int(y)))
+                self.distances[direction][x_min:x_max + 1,y] = distances
+        for state in changed:
+            self.update_vertex(state)
+
+    def cost(self, state):
+        '''
+        Return the number of actions and the length of movement from the state to the destinations.
+        '''
+        self.compute()
+        return self.g.get(tuple(state), self.infinity)
+
+    def path(self, starting):
+        '''
+        Calculate the best path from starting to the destinations.
+        starting: the coordinates of starting point.
+        return: list of direction, list of movement, list of path
+        '''
+        self.compute()
+        state = (int(starting[0]), int(starting[1]))
+        # Micromouse stays still if it is already at the destinations or the destinations could not be reached
+        if (state in self.destinations) or (state not in self.g):
+            if state not in self.destinations:
+                print('Warning: destinations could not be reached!')
+            return ['up'], [0], [list(state), list(state)]
+
+        path_list = [list(state)]
+        direction_list = list()
+        movement_list = list()
+        while state not in self.destinations:
+            cost_best = self.infinity
+            for direction, movement, state_next, length in self.successors(state):
+                g = self.g.get(state_next, self.infinity)
+                if (g[0] + 1, g[1] + length) < cost_best:
+                    cost_best = (g[0] + 1, g[1] + length)
+                    action_best = (direction, movement, state_next)
+            direction_list.append(action_best[0])
+            movement_list.append(action_best[1])
+            state = action_best[2]
+            path_list.append(list(state))
+
+        return direction_list, movement_list, path_list
+
+    def paths_best(self, starting):
+        '''
+        Find all the destinations which take the least number of actions and then the smallest length of movement from starting, and the best path to each of them. Only the actions on the best paths are followed, so the states searched are those on the best paths.
+        starting: the coordinates of starting point.
+        return: a dictionary of the best path to each of the destinations found, as list of direction, list of movement, list of path. It is empty if starting is one of the destinations or the destinations could not be reached.
+        '''
+        self.compute()
+        state = (int(starting[0]), int(starting[1]))
+        if (state in self.destinations) or (state not in self.g):
+            return dict()
+
+        # The last action to each state searched on the best paths
+        parents = {state: None}
+        queue = collections.deque([state])
+        destinations_best = list()
+        while queue:
+            state = queue.popleft()
+            if state in self.destinations:
+                destinations_best.append(state)
+                continue
+            g = self.g[state]
+            for direction, movement, state_next, length in self.successors(state):
+                g_next = self.g.get(state_next, self.infinity)
+                if ((g_next[0] + 1, g_next[1] + length) == g) and (state_next not in parents):
+                    parents[state_next] = (state, direction, movement)
+                    queue.append(state_next)
+
+        paths = dict()
+        for destination in destinations_best:
+            path_list = [list(destination)]
+            direction_list = list()
+            movement_list = list()
+            state = destination
+            while parents[state] is not None:
+                state, direction, movement = parents[state]
+                path_list.append(list(state))
+                direction_list.append(direction)
+                movement_list.append(movement)
+            paths[destination] = (direction_list[::-1], movement_list[::-1], path_list[::-1])
+
+        return paths
+
+def movements_contiguous(movements):
+    '''
+    Check that the movements allowed contain all the lengths from 1 to the longest one, so that a straight line could be split into actions of the longest movement and one shorter movement.
+    movements: a list of movement length allowed.
+    '''
+    movement_max = max(movements)
+    return (movement_max > 0) and set(range(1, movement_max + 1)) <= set(movements)
+
+def merge_segments(starting, segments, movement_max):
+    '''
+    Merge the straight segments of a path into actions. The consecutive segments in the same direction form one straight line, which is moved with the longest movement in each action.
+    starting: the coordinates of starting point.
+    segments: list of straight segments as tuples of (direction, number of cells).
+    movement_max: the longest movement allowed.
+    return: list of direction, list of movement, list of path
+    '''
+    lines = list()
+    for direction, segment in segments:
+        if (len(lines) > 0) and (lines[-1][0] == direction):
+            lines[-1][1] += segment
+        else:
+            lines.append([direction, segment])
+    direction_list = list()
+    movement_list = list()
+    path_list = [list(starting)]
+    cell = list(starting)
+    for direction, line in lines:
+        dx, dy = direction_steps[direction]
+        while line > 0:
+            movement = min(line, movement_max)
+            cell = [cell[0] + dx * movement, cell[1] + dy * movement]
+            direction_list.append(direction)
+            movement_list.append(movement)
+            path_list.append(cell)
+            line -= movement
+    # Micromouse stays still if there is no movement
+    if len(direction_list) == 0:
+        return ['up'], [0], [list(starting), list(starting)]
+
+    return direction_list, movement_list, path_list
+
+class Corridor_Graph(object):
+    def __init__(self, maze, movements, nodes = []):
+        '''
+        Collapse the corridors of the maze, the cells with exactly two openings, into edges between the other cells. The nodes of the graph are the junctions, the dead-ends and the cells given in nodes, such as the destinations.
+        maze: Maze, Maze_Learned or Maze_Window class. The wall planes of the maze are used.
+        movements: a list of movement length allowed. It should contain all the lengths from 1 to the longest one.
+        nodes: list of coordinates of the cells which should be nodes.
+        Each edge is a tuple of (target node, length of movement, list of straight segments). A segment is a tuple of (direction, number of cells).
+        Corridor_Graph objects have the following attributes:
+        - num_cells: the number of cells with at least one opening.
+        - num_nodes: the number of nodes.
+        - num_edges: the number of edges.
+        '''
+        if not movements_contiguous(movements):
+            raise Exception('Corridor graph requires all the movements from 1 to the longest one!')
+        self.movement_max = max(movements)
+        self.planes = dict()
+        openings = np.zeros(maze.walls.shape, dtype = int)
+        for direction in ['up', 'down', 'left', 'right']:
+            self.planes[direction] = np.asarray(maze.planes[direction][:,:])
+            openings += self.planes[direction]
+        is_node = (openings > 0) & (openings != 2)
+        for node in nodes:
+            is_node[tuple(node)] = True
+        self.nodes = set([tuple(node) for node in np.argwhere(is_node).tolist()])
+        self.edges = dict()
+        for node in self.nodes:
+            self.edges[node] = self.walk_all(cell = node)
+        self.num_cells = int(np.count_nonzero(openings))
+        self.num_nodes = len(self.nodes)
+        self.num_edges = sum([len(edges) for edges in self.edges.values()])
+
+    def walk(self, cell, direction):
+        '''
+        Follow the corridor leaving the cell in the direction given until a node is reached.
+        return: the edge of the corridor.
+        '''
+        origin = cell
+        segments = list()
+        length = 0
+        while True:
+            dx, dy = direction_steps[direction]
+            cell = (cell[0] + dx, cell[1] + dy)
+            length += 1
+            if (len(segments) > 0) and (segments[-1][0] == direction):
+                segments[-1] = (direction, segments[-1][1] + 1)
+            else:
+                segments.append((direction, 1))
+            if (cell in self.nodes) or (cell == origin):
+                break
+            # Leave the corridor cell through the other opening
+            for direction_next in ['up', 'down', 'left', 'right']:
+                if (direction_next != direction_opposite[direction]) and self.planes[direction_next][cell]:
+                    direction = direction_next
+                    break
+        return (cell, length, segments)
+
+    def walk_all(self, cell):
+        '''
+        Returns the edges of the corridors leaving the cell in all the open directions.
+        '''
+        return [self.walk(cell = cell, direction = direction) for direction in ['up', 'down', 'left', 'right'] if self.planes[direction][cell]]
+
+    def traverse(self, edge, direction, residual):
+        '''
+        Count the actions taken along an edge. An action moves up to the longest movement on a straight line, so a straight line continued from the last action could use the cells left in that action.
+        direction: the direction of the last action, or None at the starting point.
+        residual: the number of cells the last action could still have moved.
+        return: the number of actions, the direction and the residual at the end of the edge.
+        '''
+        num_actions = 0
+        for direction_segment, segment in edge[2]:
+            if direction_segment != direction:
+                residual = 0
+            actions = -(-max(0, segment - residual) // self.movement_max)
+            num_actions += actions
+            residual += actions * self.movement_max - segment
+            direction = direction_segment
+        return num_actions, direction, residual
+
+    def path(self, starting, destinations):
+        '''
+        Find the series of actions from the starting point to the destinations which takes the least number of actions, and then the smallest length of movement, using Dijkstra's algorithm on the graph. The states of the search are the nodes together with the direction and the residual of the last action, so that straight lines through junctions are counted exactly.
+        starting: the coordinates of starting point. It does not have to be a node.
+        destinations: the coordinates of destination points, which should be nodes.
+        return: list of direction, list of movement, list of path
+        '''
+        starting = (int(starting[0]), int(starting[1]))
+        destinations = set([(int(destination[0]), int(destination[1])) for destination in destinations])
+        if not destinations <= self.nodes:
+            raise Exception('Destinations are not nodes of the corridor graph!')
+        state_starting = (starting, None, 0)
+        cost = {state_starting: (0, 0)}
+        parent = dict()
+        num_pushed = 0
+        queue = [(0, 0, num_pushed, state_starting)]
+        state_reached = None
+        while len(queue) > 0:
+            num_actions, length, _, state = heapq.heappop(queue)
+            if (num_actions, length) > cost[state]:
+                continue
+            cell, direction, residual = state
+            if cell in destinations:
+                state_reached = state
+                break
+            edges = self.edges[cell] if cell in self.nodes else self.walk_all(cell = cell)
+            for edge in edges:
+                actions, direction_next, residual_next = self.traverse(edge = edge, direction = direction, residual = residual)
+                state_next = (edge[0], direction_next, residual_next)
+                cost_next = (num_actions + actions, length + edge[1])
+                if cost_next < cost.get(state_next, (float('inf'), float('inf'))):
+                    cost[state_next] = cost_next
+                    parent[state_next] = (state, edge)
+                    num_pushed += 1
+                    heapq.heappush(queue, (cost_next[0], cost_next[1], num_pushed, state_next))
+
+        # Micromouse stays still if it is already at the destinations or the destinations could not be reached
+        if (state_reached is None) or (state_reached == state_starting):
+            if state_reached is None:
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [list(starting), list(starting)]
+
+        # Straight segments from the starting point
+        segments = list()
+        state = state_reached
+        while state != state_starting:
+            state, edge = parent[state]
+            segments = edge[2] + segments
+
+        return merge_segments(starting = starting, segments = segments, movement_max = self.movement_max)
+
+class A_Star_Search(object):
+    def __init__(self, maze, movements, metric = 'actions'):
+        '''
+        Search one path between a starting point and destinations with A*, instead of calculating a field of all the states.
+        maze: Maze, Maze_Learned or Maze_Window class.
+        movements: a list of movement length allowed. It should contain all the lengths from 1 to the longest one.
+        metric: 'actions' finds the least number of actions, and then the smallest length of movement. 'length' finds the smallest length of movement, and then the least number of actions.
+        The heuristic of a state is a tuple of the least number of actions and the length of movement ignoring the walls. An action moves along one axis by at most the longest movement, so at least ceil(|dx| / max(movements)) + ceil(|dy| / max(movements)) actions and |dx| + |dy| cells of movement are needed. The heuristic is admissible and consistent for both metrics.
+        A_Star_Search objects have the following attributes about the last query:
+        - num_expanded: the number of states expanded.
+        - num_generated: the number of states pushed into the queue.
+        '''
+        if metric not in ['actions', 'length']:
+            raise Exception('Search metric not defined!')
+        self.maze = maze
+        self.movements = [movement for movement in movements if movement > 0]
+        self.movement_max = max(movements)
+        self.metric = metric
+        self.num_expanded = 0
+        self.num_generated = 0
+
+    def cost(self, num_actions, length):
+        '''
+        Returns the cost tuple of the metric.
+        '''
+        if self.metric == 'actions':
+            return (num_actions, length)
+        return (length, num_actions)
+
+    def heuristic(self, state, destinations):
+        '''
+        Returns the lower bound of the cost from the state to the nearest destination.
+        '''
+        heuristic_min = None
+        for destination in destinations:
+            dx = abs(destination[0] - state[0])
+            dy = abs(destination[1] - state[1])
+            heuristic = self.cost(num_actions = -(-dx // self.movement_max) - (-dy // self.movement_max), length = dx + dy)
+            if (heuristic_min is None) or (heuristic < heuristic_min):
+                heuristic_min = heuristic
+        return heuristic_min
+
+    def path(self, starting, destinations):
+        '''
+        Find the best path from the starting point to the destinations.
+        starting: the coordinates of starting point.
+        destinations: the coordinates of destination points. There can be multiple destination points.
+        return: list of direction, list of movement, list of path
+        '''
+        starting = (int(starting[0]), int(starting[1]))
+        destinations = set([(int(destination[0]), int(destination[1])) for destination in destinations])
+        self.num_expanded = 0
+        self.num_generated = 1
+        # Number of actions and length of movement of the states
+        reached = {starting: (0, 0)}
+        parent = dict()
+        closed = set()
+        queue = [(self.heuristic(state = starting, destinations = destinations), self.num_generated, starting)]
+        state_reached = None
+        while len(queue) > 0:
+            _, _, state = heapq.heappop(queue)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.num_expanded += 1
+            if state in destinations:
+                state_reached = state
+                break
+            num_actions, length = reached[state]
+            for direction in ['up', 'down', 'left', 'right']:
+                distance = self.maze.dist_to_wall(cell = state, direction = direction)
+                dx, dy = direction_steps[direction]
+                for step in sorted(set([min(distance, movement) for movement in self.movements])):
+                    state_next = (state[0] + dx * step, state[1] + dy * step)
+                    if (step == 0) or (state_next in closed):
+                        continue
+                    cost_next = self.cost(num_actions = num_actions + 1, length = length + step)
+                    if (state_next not in reached) or (cost_next < self.cost(*reached[state_next])):
+                        reached[state_next] = (num_actions + 1, length + step)
+                        parent[state_next] = (state, direction, step)
+                        self.num_generated += 1
+                        heuristic = self.heuristic(state = state_next, destinations = destinations)
+                        heapq.heappush(queue, ((cost_next[0] + heuristic[0], cost_next[1] + heuristic[1]), self.num_generated, state_next))
+
+        # Micromouse stays still if it is already at the destinations or the destinations could not be reached
+        if (state_reached is None) or (state_reached == starting):
+            if state_reached is None:
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [list(starting), list(starting)]
+
+        path_list = list()
+        direction_list = list()
+        movement_list = list()
+        state = state_reached
+        while state != starting:
+            state_last, direction, step = parent[state]
+            path_list.append(list(state))
+            direction_list.append(direction)
+            movement_list.append(step)
+            state = state_last
+        path_list.append(list(starting))
+        path_list.reverse()
+        direction_list.reverse()
+        movement_list.reverse()
+
+        return direction_list, movement_list, path_list
+
+class Search_Counter(object):
+    def __init__(self):
+        '''
+        Count the states expanded by the path queries of best_path which search instead of calculating fields.
+        Search_Counter objects have the following attributes:
+        - num_queries: the number of queries.
+        - num_expanded: the total number of states expanded.
+        - num_generated: the total number of states pushed into the queue.
+        - num_expanded_last: the number of states expanded by the last query.
+        - num_states_last: the number of states of the maze of the last query.
+        '''
+        self.clear()
+
+    def add(self, search, num_states):
+        '''
+        Add the counts of the last query of the search.
+        '''
+        self.num_queries += 1
+        self.num_expanded += search.num_expanded
+        self.num_generated += search.num_generated
+        self.num_expanded_last = search.num_expanded
+        self.num_states_last = num_states
+
+    def clear(self):
+        '''
+        Reset the counters.
+        '''
+        self.num_queries = 0
+        self.num_expanded = 0
+        self.num_generated = 0
+        self.num_expanded_last = 0
+        self.num_states_last = 0
+
+# The counter shared by best_path
+search_counter = Search_Counter()
+
+class All_Pairs_Table(object):
+    def __init__(self, maze, movements):
+        '''
+        Hold the least number of actions, and then the smallest length of movement, between all pairs of states of a small maze, with the next state on a best path of each pair.
+        maze: Maze or Maze_Learned class. For Maze_Learned the table covers the bounding box of the cells learned, and it is rebuilt when the bounding box grows.
+        movements: a list of movement length allowed. It should contain all the lengths from 1 to the longest one.
+        The cost of a pair is stored as one integer, number of actions x scale + length of movement, with the scale larger than any length, so that the smallest cost is the least number of actions and then the smallest length. While the maze is learned the walls are only removed, so the actions only get added and the table is updated by relaxing all the pairs through each new action.
+        The table has (number of states)^2 entries, so it is meant for the mazes of a few hundred states.
+        '''
+        if not movements_contiguous(movements):
+            raise Exception('All pairs table requires all the movements from 1 to the longest one!')
+        self.maze = maze
+        self.movements = movements
+        self.infinity = np.iinfo(np.int64).max // 4
+        self.build()
+
+    def build(self):
+        '''
+        Build the table of the maze from scratch by relaxing all the actions until nothing changes.
+        '''
+        if hasattr(self.maze, 'window'):
+            self.bounds = list(self.maze.window_bounds)
+            region = self.maze.window()
+        else:
+            self.bounds = [0, self.maze.walls.shape[0] - 1, 0, self.maze.walls.shape[1] - 1]
+            region = self.maze
+        self.offset = [self.bounds[0], self.bounds[2]]
+        self.dim_x = region.walls.shape[0]
+        self.dim_y = region.walls.shape[1]
+        num_states = self.dim_x * self.dim_y
+        self.scale = num_states * max(self.movements) + 1
+        self.targets = self.action_targets(region = region)
+        self.cost = np.full((num_states, num_states), fill_value = self.infinity, dtype = np.int64)
+        self.cost[np.arange(num_states), np.arange(num_states)] = 0
+        self.next_state = np.full((num_states, num_states), fill_value = -1, dtype = np.int32)
+        states = np.arange(num_states)
+        changed = True
+        while changed:
+            changed = False
+            for targets in self.targets:
+                moved = (targets != states)
+                steps = np.absolute(targets % self.dim_y - states % self.dim_y) + np.absolute(targets // self.dim_y - states // self.dim_y)
+                cost = self.scale + steps[moved,np.newaxis] + self.cost[targets[moved]]
+                improved = cost < self.cost[moved]
+                if improved.any():
+                    changed = True
+                    self.cost[moved] = np.where(improved, cost, self.cost[moved])
+                    self.next_state[moved] = np.where(improved, targets[moved,np.newaxis], self.next_state[moved])
+
+    def action_targets(self, region):
+        '''
+        Returns the list of the flattened next states of all the states for each action.
+        '''
+        return [np.ravel_multi_index((next_x.ravel(), next_y.ravel()), (self.dim_x, self.dim_y)) for direction, movement, next_x, next_y in next_state_indices(maze = region, movements = self.movements) if movement > 0]
+
+    def update(self, cells):
+        '''
+        Update the table after the walls of some cells were removed.
+        cells: list of coordinates of the cells whose walls were changed.
+        '''
+        if hasattr(self.maze, 'window') and (list(self.maze.window_bounds) != self.bounds):
+            self.build()
+            return
+        region = self.maze.window() if hasattr(self.maze, 'window') else self.maze
+        targets_updated = self.action_targets(region = region)
+        for targets, targets_new in zip(self.targets, targets_updated):
+            for state in np.flatnonzero(targets != targets_new).tolist():
+                self.relax(state = state, target = int(targets_new[state]))
+        self.targets = targets_updated
+
+    def relax(self, state, target):
+        '''
+        Relax all the pairs through a new action from the state to the target.
+        '''
+        steps = abs(target % self.dim_y - state % self.dim_y) + abs(target // self.dim_y - state // self.dim_y)
+        cost = self.cost[:,state,np.newaxis] + (self.scale + steps) + self.cost[np.newaxis,target,:]
+        improved = cost < self.cost
+        if improved.any():
+            # The pairs starting from the state take the new action first
+            next_state = self.next_state[:,state].copy()
+            next_state[state] = target
+            self.cost = np.where(improved, cost, self.cost)
+            self.next_state = np.where(improved, next_state[:,np.newaxis], self.next_state)
+
+    def index(self, cell):
+        '''
+        Returns the flattened state of a cell in the maze.
+        '''
+        return (cell[0] - self.offset[0]) * self.dim_y + (cell[1] - self.offset[1])
+
+    def count(self, starting, destination):
+        '''
+        Returns the least number of actions and the smallest length of movement from the starting point to the destination, or None if the destination could not be reached.
+        '''
+        cost = self.cost[self.index(starting), self.index(destination)]
+        if cost >= self.infinity:
+            return None
+        return int(cost // self.scale), int(cost % self.scale)
+
+    def path(self, starting, destination):
+        '''
+        Follow the next states from the starting point to the destination.
+        return: list of direction, list of movement, list of path
+        '''
+        if (list(starting) == list(destination)) or (self.count(starting = starting, destination = destination) is None):
+            if list(starting) != list(destination):
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [list(starting), list(starting)]
+        path_list = [list(starting)]
+        direction_list = list()
+        movement_list = list()
+        state = self.index(starting)
+        state_destination = self.index(destination)
+        while state != state_destination:
+            state_next = int(self.next_state[state, state_destination])
+            dx = state_next // self.dim_y - state // self.dim_y
+            dy = state_next % self.dim_y - state % self.dim_y
+            if dy > 0:
+                direction_list.append('up')
+            elif dy < 0:
+                direction_list.append('down')
+            elif dx < 0:
+                direction_list.append('left')
+            else:
+                direction_list.append('right')
+            movement_list.append(abs(dx) + abs(dy))
+            path_list.append([path_list[-1][0] + dx, path_list[-1][1] + dy])
+            state = state_next
+
+        return direction_list, movement_list, path_list
+
+class Hierarchical_Planner(object):
+    def __init__(self, maze, movements, cluster_size = 8):
+        '''
+        Plan on an abstraction of the maze in the way of HPA*. The maze is partitioned into square clusters of cluster_size x cluster_size. The entrances of a cluster are its cells open to a neighbor cluster. The least number of actions, and then the smallest length of movement, between the cells of a cluster staying inside the cluster are held in an All_Pairs_Table of the cluster.
+        A path is planned with A* on the entrances, the starting point and the destinations, and then refined cluster by cluster. Crossing into a neighbor cluster counts as one action, and the straight lines are merged into the longest movements when the path is refined, so the path is close to but not always of the least number of actions.
+        maze: Maze or Maze_Learned class.
+        movements: a list of movement length allowed. It should contain all the lengths from 1 to the longest one.
+        cluster_size: the size of the clusters.
+        The clusters are built when a query first needs them, and dropped when their walls change, so only the clusters changed are built again.
+        Hierarchical_Planner objects have the following attributes:
+        - num_built: the number of clusters built.
+        - num_expanded: the number of abstract states expanded by the last query.
+        '''
+        self.maze = maze
+        self.movements = movements
+        self.movement_max = max(movements)
+        self.cluster_size = cluster_size
+        self.dim_x = maze.walls.shape[0]
+        self.dim_y = maze.walls.shape[1]
+        self.search = A_Star_Search(maze = maze, movements = movements)
+        self.clusters = dict()
+        self.num_built = 0
+        self.num_expanded = 0
+
+    def cluster_index(self, cell):
+        '''
+        Returns the index of the cluster of the cell.
+        '''
+        return (cell[0] // self.cluster_size, cell[1] // self.cluster_size)
+
+    def cluster(self, index):
+        '''
+        Returns the cluster of the index, a dictionary of the window of the cluster, the snapshot of its walls, its All_Pairs_Table and its entrances. The entrances map to the cells they are open to in the neighbor clusters.
+        '''
+        if index in self.clusters:
+            return self.clusters[index]
+        x_min = index[0] * self.cluster_size
+        x_max = min(x_min + self.cluster_size, self.dim_x) - 1
+        y_min = index[1] * self.cluster_size
+        y_max = min(y_min + self.cluster_size, self.dim_y) - 1
+        window = Maze_Window(self.maze, x_min, x_max, y_min, y_max)
+        # Keep the actions inside the cluster
+        x = np.arange(x_max - x_min + 1)[:,np.newaxis]
+        y = np.arange(y_max - y_min + 1)[np.newaxis,:]
+        window.distances = {'up': np.minimum(window.distances['up'], y_max - y_min - y), 'down': np.minimum(window.distances['down'], y), 'left': np.minimum(window.distances['left'], x), 'right': np.minimum(window.distances['right'], x_max - x_min - x)}
+        entrances = dict()
+        borders = list()
+        if x_min > 0:
+            borders += [((x_min, y), 'left') for y in xrange(y_min, y_max + 1)]
+        if x_max < self.dim_x - 1:
+            borders += [((x_max, y), 'right') for y in xrange(y_min, y_max + 1)]
+        if y_min > 0:
+            borders += [((x, y_min), 'down') for x in xrange(x_min, x_max + 1)]
+        if y_max < self.dim_y - 1:
+            borders += [((x, y_max), 'up') for x in xrange(x_min, x_max + 1)]
+        for cell, direction in borders:
+            if self.maze.is_permissible_code(cell = cell, code = dir_int[direction]):
+                dx, dy = direction_steps[direction]
+                entrances.setdefault(cell, list()).append((cell[0] + dx, cell[1] + dy))
+        table = All_Pairs_Table(maze = window, movements = self.movements)
+        # Actions inside the cluster between all pairs of entrances
+        cells = list(entrances.keys())
+        states = np.array([table.index(cell = window.to_window(cell)) for cell in cells], dtype = int)
+        costs = table.cost[states[:,np.newaxis], states[np.newaxis,:]] if len(cells) > 0 else np.zeros((0, 0), dtype = np.int64)
+        edges = dict()
+        for i, cell in enumerate(cells):
+            edges[cell] = [(cells[j], (int(costs[i, j] // table.scale), int(costs[i, j] % table.scale))) for j in np.flatnonzero(costs[i] < table.infinity).tolist() if j != i]
+            # Cross into the neighbor clusters
+            edges[cell] += [(cell_next, (1, 1)) for cell_next in entrances[cell]]
+        # Snapshot of the walls of the cluster to find whether it changed
+        walls = np.array(self.maze.walls[x_min:x_max + 1, y_min:y_max + 1])
+        cluster = {'window': window, 'walls': walls, 'table': table, 'entrances': entrances, 'edges': edges}
+        self.clusters[index] = cluster
+        self.num_built += 1
+        return cluster
+
+    def update(self, cells):
+        '''
+        Drop the clusters whose walls were changed. Only the clusters built are compared with their snapshots, so the walls of the whole maze are never copied.
+        cells: list of coordinates of the cells whose walls were changed. Other cells changed should be in the same rows or columns.
+        '''
+        columns = set([cell[0] // self.cluster_size for cell in cells])
+        rows = set([cell[1] // self.cluster_size for cell in cells])
+        for index in list(self.clusters.keys()):
+            if (index[0] not in columns) and (index[1] not in rows):
+                continue
+            cluster = self.clusters[index]
+            x_min, y_min = cluster['window'].offset
+            walls = cluster['walls']
+            if (np.asarray(self.maze.walls[x_min:x_min + walls.shape[0], y_min:y_min + walls.shape[1]]) != walls).any():
+                del self.clusters[index]
+
+    def path(self, starting, destinations):
+        '''
+        Plan the path from the starting point to the destinations.
+        starting: the coordinates of starting point.
+        destinations: the coordinates of destination points. There can be multiple destination points.
+        return: list of direction, list of movement, list of path
+        '''
+        starting = (int(starting[0]), int(starting[1]))
+        destinations = set([(int(destination[0]), int(destination[1])) for destination in destinations])
+        # Destinations in each cluster
+        destinations_cluster = dict()
+        for destination in destinations:
+            destinations_cluster.setdefault(self.cluster_index(cell = destination), list()).append(destination)
+        self.num_expanded = 0
+        num_pushed = 0
+        reached = {starting: (0, 0)}
+        parent = dict()
+        closed = set()
+        queue = [(self.search.heuristic(state = starting, destinations = destinations), num_pushed, starting)]
+        state_reached = None
+        while len(queue) > 0:
+            _, _, state = heapq.heappop(queue)
+            if state in closed:
+                continue
+            closed.add(state)
+            self.num_expanded += 1
+            if state in destinations:
+                state_reached = state
+                break
+            num_actions, length = reached[state]
+            index = self.cluster_index(cell = state)
+            cluster = self.cluster(index = index)
+            window = cluster['window']
+            # Move inside the cluster to its entrances and destinations, or cross into the neighbor cluster
+            if state in cluster['edges']:
+                successors = list(cluster['edges'][state])
+                cells = destinations_cluster.get(index, [])
+            else:
+                successors = list()
+                cells = list(cluster['entrances'].keys()) + destinations_cluster.get(index, [])
+            for cell in cells:
+                if cell != state:
+                    count = cluster['table'].count(starting = window.to_window(state), destination = window.to_window(cell))
+                    if count is not None:
+                        successors.append((cell, count))
+            for state_next, count in successors:
+                if state_next in closed:
+                    continue
+                cost_next = (num_actions + count[0], length + count[1])
+                if (state_next not in reached) or (cost_next < reached[state_next]):
+                    reached[state_next] = cost_next
+                    parent[state_next] = state
+                    num_pushed += 1
+                    heuristic = self.search.heuristic(state = state_next, destinations = destinations)
+                    heapq.heappush(queue, ((cost_next[0] + heuristic[0], cost_next[1] + heuristic[1]), num_pushed, state_next))
+
+        # Micromouse stays still if it is already at the destinations or the destinations could not be reached
+        if (state_reached is None) or (state_reached == starting):
+            if state_reached is None:
+                print('Warning: destination could not be reached!')
+            return ['up'], [0], [list(starting), list(starting)]
+
+        # Refine the abstract path cluster by cluster
+        states = [state_reached]
+        while states[-1] != starting:
+            states.append(parent[states[-1]])
+        states.reverse()
+        segments = list()
+        for state, state_next in zip(states[:-1], states[1:]):
+            index = self.cluster_index(cell = state)
+            if index == self.cluster_index(cell = state_next):
+                cluster = self.cluster(index = index)
+                window = cluster['window']
+                direction_list, movement_list, path_list = cluster['table'].path(starting = window.to_window(state), destination = window.to_window(state_next))
+                segments += zip(direction_list, movement_list)
+            else:
+                for direction, step in direction_steps.items():
+                    if (state[0] + step[0], state[1] + step[1]) == state_next:
+                        segments.append((direction, 1))
+
+        return merge_segments(starting = starting, segments = segments, movement_max = self.movement_max)
+
+class Field_Cache(object):
+    def __init__(self, max_bytes = 64 * 1024 * 1024):
+        '''
+        Least recently used cache of the fields calculated by the planner, such as the utility values and the least number of actions of all states.
+        The fields are keyed by a hash of the maze walls, the destinations, the movements and the planning method. The least recently used fields are discarded when the total size of the fields exceeds max_bytes.
+        Field_Cache objects count the number of hits and misses.
+        The cache is only consulted by best_path. Mouse plans with Incremental_Planner, Search_Tree and Hierarchical_Planner, which do not use it.
+        '''
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.fields = collections.OrderedDict()
+
+    def key(self, maze, destinations, movements, method, starting = None):
+        '''
+        Returns the key of the field of the maze given. The starting point is only given for the fields which depend on it, such as the fields calculated on the live cells.
+        The walls are read as a numpy array with walls[:,:], so that the mazes whose walls are stored in Tiled_Array have the same key as the same mazes stored in numpy arrays.
+        '''
+        walls = np.ascontiguousarray(maze.walls[:,:])
+        walls_hash = hashlib.sha1(walls.view(np.uint8)).hexdigest()
+        destinations = tuple(sorted(set([(int(destination[0]), int(destination[1])) for destination in destinations])))
+        if starting is not None:
+            starting = (int(starting[0]), int(starting[1]))
+        return (method, walls.shape, str(walls.dtype), walls_hash, destinations, tuple(movements), starting)
+
+    def get(self, key):
+        '''
+        Returns the field of the key, or None if the field is not in the cache.
+        '''
+        field = self.fields.pop(key, None)
+        if field is None:
+            self.misses += 1
+            return None
+        # Move the field to the most recently used end
+        self.fields[key] = field
+        self.hits += 1
+        return field
+
+    def put(self, key, field):
+        '''
+        Store the field. The field is made read-only because it is shared by the callers.
+        '''
+        if key in self.fields:
+            self.nbytes -= self.fields.pop(key).nbytes
+        # Fields larger than the cache are not stored
+        if field.nbytes <= self.max_bytes:
+            field.flags.writeable = False
+            self.fields[key] = field
+            self.nbytes += field.nbytes
+        while self.nbytes > self.max_bytes:
+            key_discarded, field_discarded = self.fields.popitem(last = False)
+            self.nbytes -= field_discarded.nbytes
+
+    def clear(self):
+        '''
+        Remove all the fields and reset the counters.
+        '''
+        self.fields.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+# The cache shared by best_path
+field_cache = Field_Cache()
+
+def best_path(maze, starting, destinations, movements, method = 'value_iteration', prune = False):
     '''
     Given a rectangle maze, starting point and destination point, calculate the best path from starting to destination.
     maze: Maze class. maze.walls is a numpy array containing the wall information of the maze. The wall property can only be 'wall' or 'no wall'. maze numpy array format: maze[0] - the first vertical cells in maze, maze[1] - the second vertical cells in maze, etc.
     starting: the coordinates of starting point.
     destination: the coordinates of destination point. There can be multiple destination points.
+    method: 'value_iteration' solves the Bellman Equation as the reference. 'bfs' searches the least number of actions exactly using breadth-first search. 'corridor' searches the least number of actions on the graph of junctions with the corridors collapsed into edges, which has fewer states.
+    The movements of 'corridor' should contain all the lengths from 1 to the longest one, otherwise 'bfs' is used instead.
+    'astar' searches only one path of the least number of actions, and then the smallest length of movement, with A*. 'astar_length' searches one path of the smallest length of movement, and then the least number of actions. The states expanded are counted by search_counter.
+    prune: calculate the field of 'value_iteration' or 'bfs' only on the live cells from live_cells, which removes the cells that could not be reached from the starting point and the dead-end branches. The dead-end branches are kept if the movements do not contain all the lengths from 1 to the longest one.
     return: list of direction, list of movement, list of path
     '''
-    # Calculate the utility value of each state
-    utility = utility_calculation(maze = maze, destinations = destinations, movements = movements)
+    if method not in ['value_iteration', 'bfs', 'corridor', 'astar', 'astar_length']:
+        raise Exception('Planning method not defined!')
+    if (method == 'corridor') and not movements_contiguous(movements):
+        # The corridors could not be split into the movements allowed
+        method = 'bfs'
+    if method in ['astar', 'astar_length']:
+        # Search one path without calculating a field
+        search = A_Star_Search(maze = maze, movements = movements, metric = 'actions' if method == 'astar' else 'length')
+        path = search.path(starting = starting, destinations = destinations)
+        search_counter.add(search = search, num_states = maze.walls.shape[0] * maze.walls.shape[1])
+        return path
+    if method == 'corridor':
+        # Plan on the graph of junctions, dead-ends and destinations
+        corridor_graph = Corridor_Graph(maze = maze, movements = movements, nodes = destinations)
+        return corridor_graph.path(starting = starting, destinations = destinations)
+    # Use the field calculated before for the same maze, destinations and movements
+    if prune:
+        key = field_cache.key(maze = maze, destinations = destinations, movements = movements, method = method + '_pruned', starting = starting)
+    else:
+        key = field_cache.key(maze = maze, destinations = destinations, movements = movements, method = method)
+    field = field_cache.get(key)
+    live = None
+    if (field is None) and prune:
+        live = live_cells(maze = maze, starting = starting, destinations = destinations, movements = movements)
+    if method == 'value_iteration':
+        # Calculate the utility value of each state
+        if field is None:
+            field = utility_calculation(maze = maze, destinations = destinations, movements = movements, live = live)
+            field_cache.put(key, field)
+        action_next = lambda state: best_action(maze = maze, utility = field, state = state, destinations = destinations, movements = movements)
+    elif method == 'bfs':
+        # Calculate the least number of actions of each state
+        if field is None:
+            field = action_count_calculation(maze = maze, destinations = destinations, movements = movements, live = live)
+            field_cache.put(key, field)
+        action_next = lambda state: best_action_count(maze = maze, action_count = field, state = state, destinations = destinations, movements = movements)
     
+    # Check that any destination is reachable before following the field, otherwise the path would wander until the threshold
+    starting_cells = np.zeros(maze.walls.shape, dtype = bool)
+    starting_cells[tuple(starting)] = True
+    reachable = flood_fill(planes = maze.planes, cells = starting_cells)
+    if not any([reachable[tuple(destination)] for destination in destinations]):
+        print('Warning: no destination is reachable from the starting point!')
+        return ['up'], [0], [list(starting), list(starting)]
+
     # Set maximum number of actions one could tolerate
     action_threhold = maze.walls.shape[0] * maze.walls.shape[1]
 
@@ -121,7 +1535,7 @@ def best_path(maze, starting, destinations, movements):
     movement_list = list()
 
     state_last = starting
-    action = best_action(maze = maze, utility = utility, state = state_last, destinations = destinations, movements = movements)
+    action = action_next(state_last)
     direction_list.append(action[0])
     movement_list.append(action[1])
     path_list.append(action[2])
@@ -132,7 +1546,7 @@ def best_path(maze, starting, destinations, movements):
             print(maze.walls[tuple(destinations[0])])
             break
         state_last = action[2]
-        action = best_action(maze = maze, utility = utility, state = state_last, destinations = destinations, movements = movements)
+        action = action_next(state_last)
         direction_list.append(action[0])
         movement_list.append(action[1])
         path_list.append(action[2])
@@ -182,13 +1596,49 @@ if __name__ == '__main__':
     print(path_list)
     print('The length of the path to the destination is %d.' % (length_count(path_list = path_list)))
 
+    # Calling best_path again on the unchanged maze uses the field in the cache
+    field_cache.clear()
+    for i in xrange(2):
+        direction_list, movement_list, path_list = best_path(maze = testmaze, starting = starting, destinations = testmaze.destinations, movements = movements, method = 'bfs')
+    if (field_cache.misses != 1) or (field_cache.hits != 1):
+        raise Exception('The field of the unchanged maze was not served from the cache!')
+    print('Calling best_path twice on the unchanged maze calculates the field once, with %d hit and %d miss in the cache.' % (field_cache.hits, field_cache.misses))
 
+    # Count the states expanded by A*
+    for method in ['astar', 'astar_length']:
+        direction_list, movement_list, path_list = best_path(maze = testmaze, starting = starting, destinations = testmaze.destinations, movements = movements, method = method)
+        print('A* of %s takes %d actions and the length of the path is %d, expanding %d of %d states.' % (method, len(path_list) - 1, length_count(path_list = path_list), search_counter.num_expanded_last, search_counter.num_states_last))
 
+    # Prune the cells which could not be on a best path
+    live, statistics = live_cells(maze = testmaze, starting = starting, destinations = testmaze.destinations, return_statistics = True)
+    print('Pruning removes %d unreachable cells and %d dead-end cells in %d iterations, leaving %d of %d cells, in %f seconds.' % (statistics['num_unreachable'], statistics['num_dead_ends'], statistics['num_iterations'], statistics['num_live'], statistics['num_cells'], statistics['time']))
+    direction_list, movement_list, path_list = best_path(maze = testmaze, starting = starting, destinations = testmaze.destinations, movements = movements, prune = True)
+    print('Planning on the live cells takes %d actions.' % (len(path_list) - 1))
 
+    # Without the movement of 1, a best path might enter a dead-end branch, which is then not pruned
+    pruning_maze = generate_maze(dim_x = 20, dim_y = 12, maze_type = 'rooms', seed = 29)
+    for method in ['bfs', 'value_iteration']:
+        direction_list, movement_list, path_list = best_path(maze = pruning_maze, starting = [9,11], destinations = pruning_maze.destinations, movements = [0,2,3], method = method)
+        num_actions = len(path_list) - 1
+        direction_list, movement_list, path_list = best_path(maze = pruning_maze, starting = [9,11], destinations = pruning_maze.destinations, movements = [0,2,3], method = method, prune = True)
+        if len(path_list) - 1 != num_actions:
+            raise Exception('Pruning changed the number of actions with movements of 0, 2 and 3!')
+    print('Planning on the live cells with movements of 0, 2 and 3 takes %d actions, the same as without pruning.' % (num_actions))
 
+    # Compare the size of the corridor graph to the number of cells
+    corridor_graph = Corridor_Graph(maze = testmaze, movements = movements, nodes = testmaze.destinations)
+    print('The corridor graph has %d nodes and %d edges for %d open cells.' % (corridor_graph.num_nodes, corridor_graph.num_edges, corridor_graph.num_cells))
+    direction_list, movement_list, path_list = best_path(maze = testmaze, starting = starting, destinations = testmaze.destinations, movements = movements, method = 'corridor')
+    print('Planning on the corridor graph takes %d actions and the length of the path is %d.' % (len(path_list) - 1, length_count(path_list = path_list)))
 
+    # Evaluate all the starting points in one backward search
+    reverse_search_tree = Reverse_Search_Tree(maze = testmaze, destinations = testmaze.destinations, movements = movements)
+    statistics = reverse_search_tree.statistics()
+    print('Over the %d starting points which could reach the destination, the mean number of actions is %f and the maximum is %d.' % (statistics['num_starting'], statistics['action_count_mean'], statistics['action_count_max']))
+    print('The hardest starting point is %s.' % (reverse_search_tree.ranking()[0]))
 
-
-
-
-
+    # Compare the number of sweeps of value iteration options
+    for update in ['jacobi', 'gauss_seidel']:
+        for stop in ['residual', 'policy']:
+            utility, num_sweeps, residuals = utility_calculation(maze = testmaze, destinations = testmaze.destinations, movements = movements, update = update, stop = stop, return_statistics = True)
+            print('Value iteration with %s update and %s stop takes %d sweeps. The last residual is %f.' % (update, stop, num_sweeps, residuals[-1]))
@@ -8,6 +8,7 @@ Notes: This script is modified from the original showmaze.py in Udacity Machine
 '''
 
 from maze import Maze
+import numpy as np
 import turtle
 import sys
 import os
@@ -43,10 +44,16 @@ if __name__ == '__main__':
     origin_x = testmaze.dim_x * sq_size / -2
     origin_y = testmaze.dim_y * sq_size / -2
 
+    # check the walls of all the squares at once, indexed by [x, y]
+    cells = np.indices((testmaze.dim_x, testmaze.dim_y)).reshape(2, -1).T
+    opened = dict()
+    for direction, code in [('up', 1), ('right', 2), ('down', 4), ('left', 8)]:
+        opened[direction] = testmaze.are_permissible(cells = cells, codes = code).reshape(testmaze.dim_x, testmaze.dim_y)
+
     # iterate through squares one by one to decide where to draw walls
     for x in range(testmaze.dim_x):
         for y in range(testmaze.dim_y):
-            if not testmaze.is_permissible([x,y], 'up'):
+            if not opened['up'][x,y]:
                 wally.goto(origin_x + sq_size * x, origin_y + sq_size * (y+1))
                 # Set turtle heading orientation
                 # 0 - east, 90 - north, 180 - west, 270 - south
@@ -55,7 +62,7 @@ if __name__ == '__main__':
                 wally.forward(sq_size)
                 wally.penup()
 
-            if not testmaze.is_permissible([x,y], 'right'):
+            if not opened['right'][x,y]:
                 wally.goto(origin_x + sq_size * (x+1), origin_y + sq_size * y)
                 wally.setheading(90)
                 wally.pendown()
@@ -63,7 +70,7 @@ if __name__ == '__main__':
                 wally.penup()
 
             # only check bottom wall if on lowest row
-            if y == 0 and not testmaze.is_permissible([x,y], 'down'):
+            if y == 0 and not opened['down'][x,y]:
                 wally.goto(origin_x + sq_size * x, origin_y)
                 wally.setheading(0)
                 wally.pendown()
@@ -71,7 +78,7 @@ if __name__ == '__main__':
                 wally.penup()
 
             # only check left wall if on leftmost column
-            if x == 0 and not testmaze.is_permissible([x,y], 'left'):
+            if x == 0 and not opened['left'][x,y]:
                 wally.goto(origin_x, origin_y + sq_size * y)
                 wally.setheading(90)
                 wally.pendown()
@@ -0,0 +1,187 @@
+'''
+Micromouse Maze Solver
+Author: Lei Mao
+Website: https://github.com/leimao/
+Date: 2017/2/15
+Content: Exploration strategies which choose the next destination of the micromouse during the exploration.
+'''
+
+import numpy as np
+import time
+from maze import expand_planes
+from maze import dir_int
+from planner import Search_Tree
+from planner import direction_steps
+
+
+class Exploration_Strategy(object):
+    def __init__(self):
+        '''
+        Exploration_Strategy objects choose the next destination of the micromouse from what it has learned. A strategy implements destination(mouse), and Mouse.mouse_action calls step(mouse), which also measures the compute cost of each step.
+        Exploration_Strategy objects have the following attributes:
+        - num_steps: the number of steps taken.
+        - compute_time_last: the compute time of the last step in seconds.
+        - compute_time_total: the total compute time of all the steps in seconds.
+        - compute_time_max: the largest compute time of one step in seconds.
+        '''
+        self.num_steps = 0
+        self.compute_time_last = 0
+        self.compute_time_total = 0
+        self.compute_time_max = 0
+
+    def destination(self, mouse):
+        '''
+        Choose the next destination of the mouse.
+        mouse: the Mouse object exploring the maze.
+        return: destination, list of direction, list of movement, list of path
+        '''
+        raise Exception('Exploration strategy is not implemented!')
+
+    def step(self, mouse):
+        '''
+        Choose the next destination of the mouse and record the compute cost.
+        mouse: the Mouse object exploring the maze.
+        return: destination, list of direction, list of movement, list of path
+        '''
+        time_start = time.time()
+        destination_best, direction_list, movement_list, path_list = self.destination(mouse = mouse)
+        self.compute_time_last = time.time() - time_start
+        self.compute_time_total += self.compute_time_last
+        self.compute_time_max = max(self.compute_time_max, self.compute_time_last)
+        self.num_steps += 1
+
+        return destination_best, direction_list, movement_list, path_list
+
+    def statistics(self):
+        '''
+        Returns a dictionary of the compute cost of the steps taken: the number of steps, and the mean, the maximum and the total compute time of one step in seconds.
+        '''
+        return {'num_steps': self.num_steps, 'compute_time_mean': self.compute_time_total / max(self.num_steps, 1), 'compute_time_max': self.compute_time_max, 'compute_time_total': self.compute_time_total}
+
+
+class Nearest_Unvisited_Strategy(Exploration_Strategy):
+    '''
+    Go to the unvisited grid that takes the least number of actions, as chosen by Mouse.destination_next with the intuition and heuristic options of the mouse.
+    '''
+    def destination(self, mouse):
+
+        return mouse.destination_next()
+
+
+class Flood_Fill_Strategy(Exploration_Strategy):
+    '''
+    The classic flood-fill exploration. The grids which have never been sensed are the targets, and the walls which have not been observed are assumed to be open. The number of grids to the nearest target is flooded from the targets, and the mouse takes the one action going down the flooded values, stopping at the first unvisited grid to sense it. The walls of the visited grids are all observed, so the mouse only moves through openings it has learned.
+    If no target could be reached, the strategy falls back to Mouse.destination_next.
+    '''
+    def destination(self, mouse):
+
+        # The grids learned and the grids around them, where the walls between two unvisited grids are assumed to be open
+        maze, (x_min, y_min) = mouse.maze_optimistic()
+        walls = np.asarray(mouse.maze_learned.walls[x_min:x_min + maze.dim_x, y_min:y_min + maze.dim_y])
+        visited = np.asarray(mouse.maze_visited[x_min:x_min + maze.dim_x, y_min:y_min + maze.dim_y]) != 0
+        planes = maze.planes
+
+        # Flood the number of grids to the nearest target
+        flooded = np.full(walls.shape, fill_value = -1, dtype = np.int32)
+        cells = (walls == 0) & (~visited)
+        level = 0
+        while cells.any():
+            flooded[cells] = level
+            cells = expand_planes(planes = planes, cells = cells) & (flooded < 0)
+            level += 1
+
+        # Go down the flooded values from the current location
+        # The window may be clipped at the edge of mouse's memory, so the grids outside of it are never looked up
+        location = (mouse.location_defined[0] - x_min, mouse.location_defined[1] - y_min)
+        direction_best = None
+        for direction in ['up', 'right', 'down', 'left']:
+            cell = (location[0] + direction_steps[direction][0], location[1] + direction_steps[direction][1])
+            if not ((0 <= cell[0] < walls.shape[0]) and (0 <= cell[1] < walls.shape[1])):
+                continue
+            if (walls[location] & dir_int[direction]) and (flooded[cell] >= 0):
+                if (direction_best is None) or (flooded[cell] < flooded_best):
+                    direction_best = direction
+                    flooded_best = flooded[cell]
+        if direction_best is None:
+            return mouse.destination_next()
+
+        # Keep going straight while the flooded values decrease, until an unvisited grid is reached
+        step = direction_steps[direction_best]
+        cell = location
+        movement = 0
+        while (movement + 1) in mouse.movements:
+            cell_next = (cell[0] + step[0], cell[1] + step[1])
+            if not ((0 <= cell_next[0] < walls.shape[0]) and (0 <= cell_next[1] < walls.shape[1])):
+                break
+            if not (walls[cell] & dir_int[direction_best]) or (flooded[cell_next] != flooded[cell] - 1):
+                break
+            cell = cell_next
+            movement += 1
+            if not visited[cell]:
+                break
+
+        destination_best = [cell[0] + x_min, cell[1] + y_min]
+
+        return destination_best, [direction_best], [movement], [mouse.location_defined[:], destination_best]
+
+
+class Frontier_Tour_Strategy(Exploration_Strategy):
+    def __init__(self, tour_size = 6):
+        '''
+        Order the unvisited grids nearest to the mouse into a tour that takes the least number of actions in total, and go to the first grid of the tour. The tour is built from the nearest grid by the number of actions and improved by reversing its segments (2-opt). Compared with going to the nearest unvisited grid, the first grid is chosen for the whole tour rather than for the next action only.
+        tour_size: the number of unvisited grids, nearest to the mouse regarding the Manhattan Distance, in the tour.
+        '''
+        Exploration_Strategy.__init__(self)
+        self.tour_size = tour_size
+        # The last tour of the grids planned
+        self.tour = list()
+
+    def destination(self, mouse):
+
+        if len(mouse.frontier) == 0:
+            self.tour = list()
+            return mouse.destination_next()
+
+        # The number of actions and the length of movement between the current location and the grids of the tour
+        window = mouse.maze_learned.window()
+        nodes = [mouse.location_defined] + mouse.frontier.nearest(location = mouse.location_defined, k = self.tour_size)
+        search_trees = [Search_Tree(maze = window, starting = window.to_window(node), movements = mouse.movements) for node in nodes]
+        # The number of actions dominates the length of movement
+        scale = window.walls.size * max(mouse.movements) + 1
+        cost = np.zeros((len(nodes), len(nodes)), dtype = np.int64)
+        for i, search_tree in enumerate(search_trees):
+            for j, node in enumerate(nodes):
+                action_count = search_tree.action_count[tuple(window.to_window(node))]
+                if action_count < 0:
+                    cost[i,j] = scale * scale
+                else:
+                    cost[i,j] = action_count * scale + search_tree.length[tuple(window.to_window(node))]
+
+        # Build the tour from the nearest grid
+        tour = [0]
+        remaining = range(1, len(nodes))
+        while len(remaining) > 0:
+            j = min(remaining, key = lambda j: cost[tour[-1],j])
+            tour.append(j)
+            remaining.remove(j)
+
+        # Reverse the segments of the tour as long as the tour gets shorter
+        improved = True
+        while improved:
+            improved = False
+            for i in xrange(1, len(tour) - 1):
+                for j in xrange(i + 1, len(tour)):
+                    # Reversing tour[i:j + 1] changes the edges into tour[i] and out of tour[j]
+                    change = cost[tour[i - 1],tour[j]] - cost[tour[i - 1],tour[i]]
+                    if j + 1 < len(tour):
+                        change += cost[tour[i],tour[j + 1]] - cost[tour[j],tour[j + 1]]
+                    if change < 0:
+                        tour[i:j + 1] = tour[i:j + 1][::-1]
+                        improved = True
+
+        self.tour = [nodes[i] for i in tour[1:]]
+        destination_best = self.tour[0]
+        direction_list, movement_list, path_list = search_trees[0].path(destination = window.to_window(destination_best))
+        path_list = [window.to_maze(cell) for cell in path_list]
+
+        return destination_best, direction_list, movement_list, path_list
@@ -16,22 +16,29 @@ from maze import Maze_Learned
 from planner import best_path
 from planner import length_count
 from mouse import Mouse
+from generator import generate_maze
+from strategy import Nearest_Unvisited_Strategy
+from strategy import Flood_Fill_Strategy
+from strategy import Frontier_Tour_Strategy
 from observer import orientation_observed
 from observer import coordinate_observed
 from observer import destination_expectation
 
 
-def mouse_test(maze, mouse, mode):
-    
+def mouse_test(maze, mouse, mode, starting = [0,0]):
+    '''
+    Simulate the mouse in the maze from the starting point. The starting points could be ranked with planner.Reverse_Search_Tree.
+    In mode 'optimal', the optimality gap of the mouse is recorded in mouse.optimality_gaps at each step.
+    '''
+
     # Check arguments
-    if (mode != 'complete') and (mode != 'incomplete'):
+    if (mode != 'complete') and (mode != 'incomplete') and (mode != 'optimal'):
         raise Exception('Argument Error!')
 
     testmaze = maze
     testmouse = mouse
 
     # Initialize the micromouse
-    starting = [0,0]
     destination_final = testmaze.destinations
     location_real = starting[:]
     orientation_real = 'up'
@@ -53,16 +60,20 @@ def mouse_test(maze, mouse, mode):
     exploration_time = 0
     maze_visited_observed = np.zeros((testmaze.dim_x, testmaze.dim_y), dtype = np.int32)
     maze_visited_observed[tuple(starting)] = 1
-    percentage_maze_visited_observed = float(np.sum(maze_visited_observed))/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
+    num_visited_observed = 1
+    percentage_maze_visited_observed = float(num_visited_observed)/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
 
     # Explore the maze
 
     # If argument 1 is 'incomplete', return when mouse found destination
     # If argument 2 is 'complete', return when mouse visited all the grids reachable
+    # If argument 3 is 'optimal', return when mouse found destination and the path to the destination is proved to be optimal
+
+    optimality_gap = None
 
     exploration_start = time.time()
 
-    while ((testmouse.percentage_visited < 1.0) if (mode == 'complete') else (testmouse.found_destination == False)):
+    while ((testmouse.percentage_visited < 1.0) if (mode == 'complete') else (testmouse.found_destination == False) if (mode == 'incomplete') else (optimality_gap != 0)):
 
         # Action parameters of mouse
         destination_best, direction_list, movement_list, path_list = testmouse.mouse_action(maze = testmaze, location_real = location_real, orientation_real = orientation_real)
@@ -89,8 +100,10 @@ def mouse_test(maze, mouse, mode):
             print('Warning: location_expected did not match location_real.')
 
         # Update observed maze_visited
+        if maze_visited_observed[tuple(location_real)] == 0:
+            num_visited_observed += 1
         maze_visited_observed[tuple(location_real)] = 1
-        percentage_maze_visited_observed = float(np.sum(maze_visited_observed))/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
+        percentage_maze_visited_observed = float(num_visited_observed)/(maze_visited_observed.shape[0] * maze_visited_observed.shape[1])
 
         # Check if the mouse reached final destination
         if location_real in destination_final:
@@ -106,6 +119,10 @@ def mouse_test(maze, mouse, mode):
         # Update location_last
         location_last = location_real
 
+        # Compare the path to the destination with its lower bound
+        if mode == 'optimal':
+            optimality_gap = testmouse.optimality_gap()
+
         #print('location_real',location_real)
         #print('total num_actions',num_actions_1)
         #print('length_movement',length_movement_1)
@@ -194,17 +211,48 @@ def mouse_test(maze, mouse, mode):
 
 
 
+def memory_edge_test():
+    '''
+    Simulate the mouse in 'optimal' mode in a generated maze of 16 x 16 grids with memory_size 32, twice the maze size. The grids learned reach the edge of mouse's memory, where the window of the optimistic maze is clipped and could have odd dimensions.
+    '''
+    testmaze = generate_maze(dim_x = 16, dim_y = 16, maze_type = 'braided', seed = 0)
+    testmouse = Mouse(memory_size = 32, movements = [0,1,2,3])
+    mouse_test(maze = testmaze, mouse = testmouse, mode = 'optimal')
+    maze, offset = testmouse.maze_optimistic()
+    print('The optimistic maze at the edge of the memory has %d x %d grids.' %(maze.dim_x, maze.dim_y))
+
+def regression_test(num_seeds = 3):
+    '''
+    Simulate the mouse in generated mazes of 16 x 16 grids with memory_size 32, twice the maze size, so that the grids learned reach the edge of mouse's memory, in all the modes and with all the exploration strategies.
+    num_seeds: number of mazes generated for each case.
+    '''
+    for seed in xrange(num_seeds):
+        for mode in ['complete', 'incomplete', 'optimal']:
+            for strategy in [Nearest_Unvisited_Strategy, Flood_Fill_Strategy, Frontier_Tour_Strategy]:
+                print('Regression: %d. Mode: %s. Strategy: %s.' %(seed, mode, strategy.__name__))
+                testmaze = generate_maze(dim_x = 16, dim_y = 16, maze_type = 'braided', seed = seed)
+                testmouse = Mouse(memory_size = 32, movements = [0,1,2,3], strategy = strategy())
+                mouse_test(maze = testmaze, mouse = testmouse, mode = mode)
+
 if __name__ == '__main__':
     '''
     Simulate the mouse in the maze multiple times and record the simulation results.
+    Run the regression cases instead if the argument is 'regression', or the memory edge case if it is 'memory_edge'.
     '''
 
+    if str(sys.argv[1]) == 'regression':
+        regression_test()
+        sys.exit()
+    if str(sys.argv[1]) == 'memory_edge':
+        memory_edge_test()
+        sys.exit()
+
     # Create Pandas DataFrame to record simulation results
     column_names = ['maze', 'mode', 'intuition', 'heuristic', 'num_actions_1', 'length_movement_1', 'num_actions_2', 'length_movement_2', 'num_actions_3', 'length_movement_3', 'true_coverage', 'score', 'exploration_time', 'computation_time']
     df = pd.DataFrame(columns = column_names)
 
     num_tests = 10
-    modes = ['complete', 'incomplete']
+    modes = ['complete', 'incomplete', 'optimal']
     intuitions = [False, True]
     heuristics = [False, True]
 